@@ -3,8 +3,8 @@ import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 
 from src.data_ingestion.openf1_loader import get_driver_image
-from src.data_ingestion.fastf1_loader import get_driver_full_info, get_distinct_drivers
-from src.utils.plot_utils import TEAM_COLORS
+from src.data_ingestion.fastf1_loader import get_all_driver_profiles, get_driver_full_info, get_distinct_drivers
+from src.utils.plot_utils import TEAM_COLORS, downsample_frame, figure_width
 
 @st.cache_data(show_spinner='Getting the list of available drivers...')
 def get_drivers_data():
@@ -45,10 +45,14 @@ def plot_driver_results(df):
 
     fig, ax = plt.subplots(figsize=(12,6))
 
+    # Downsampled to the figure's width, keeping the races where the driver changed team
+    kept = df.index.isin(downsample_frame(df, 'RaceIndex', 'Position', width=figure_width(fig)).index)
+    plotted = df.loc[kept | (df['TeamName'] != df['TeamName'].shift())]
+
     segment_x, segment_y = [], []
     prev_team = df.loc[0, 'TeamName']
 
-    for i, row in df.iterrows():
+    for i, row in plotted.iterrows():
         current_team = row['TeamName']
         color = TEAM_COLORS.get(current_team, '#888888')
 
@@ -179,10 +183,16 @@ def plot_h2h_summary(h2h_analysis):
     with col2:
         st.plotly_chart(fig_race, use_container_width=True)
     
-@st.cache_data(show_spinner='Fetching ALL the possible thata for this driver... This may take a sec..')
+@st.cache_data(show_spinner='Building driver profiles for the whole grid...')
+def get_driver_profiles():
+    # Every driver's profile is computed in one pass, so switching drivers is only a lookup
+    return get_all_driver_profiles()
+
 def get_driver_info(driver):
-    full_data = get_driver_full_info(driver)
-    return full_data
+    profile = get_driver_profiles().get(driver)
+    if profile is None:
+        profile = get_driver_full_info(driver)
+    return profile
 
 
 drivers_list = get_drivers_data()
@@ -6,6 +6,7 @@ from datetime import timedelta
 from src.data_ingestion.openf1_loader import *
 from src.data_ingestion.fastf1_loader import get_kpis_from_session, get_session_top5_drivers_laps, get_session_tyre_distribution
 from src.utils.other_utils import format_laptime
+from src.utils.plot_utils import downsample_frame
 
 ### Driver-related methods
 def load_driver_data():
@@ -98,7 +99,7 @@ if load_data:
             # Top 5 drivers laptimes line chart
             if not top5_driver_laps.empty:
                 fig = px.line(
-                    top5_driver_laps,
+                    downsample_frame(top5_driver_laps, 'LapNumber', 'LapTimeSeconds', group='Driver'),
                     x='LapNumber',
                     y='LapTimeSeconds',
                     color = 'Driver',
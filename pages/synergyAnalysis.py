@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
 
-from src.data_ingestion.openf1_loader import get_recent_drivers
-from src.data_ingestion.fastf1_loader import get_synergy_metrics
+from src.data_ingestion.openf1_async import get_recent_drivers
+from src.data_ingestion.fastf1_loader import get_synergy_metrics, get_driver_synergy_per_race
 from src.utils.plot_utils import RACE_COLOR, QUALI_COLOR
 
 @st.cache_data(show_spinner='Loading list of recent drivers...')
@@ -15,6 +15,10 @@ def get_synergy_stats(driver, season):
     synergy_results = get_synergy_metrics(driver, season)
     return synergy_results
 
+@st.cache_data(show_spinner='Getting synergy per race...')
+def get_synergy_per_race(driver, season):
+    return pd.DataFrame(get_driver_synergy_per_race(driver, season, season))
+
 cols = st.columns(3)
 with cols[0]:
     driver = st.selectbox("Driver", get_latest_drivers())
@@ -57,4 +61,9 @@ if analyse_synergy:
             'LapDelta': lap_deltas
         }
         df = pd.DataFrame(plot2_data)
-        st.line_chart(df, color=f'#{synergy_stats.get('Color')}')
\ No newline at end of file
+        st.line_chart(df, color=f'#{synergy_stats.get('Color')}')
+
+    synergy_per_race = get_synergy_per_race(driver, season)
+    if not synergy_per_race.empty:
+        st.markdown('Synergy per race')
+        st.line_chart(synergy_per_race.set_index('Round')[['Synergy']], color=f"#{synergy_stats.get('Color')}")
@@ -1,13 +1,23 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+import plotly.graph_objects as go
 from datetime import datetime
 
-from src.data_ingestion.openf1_loader import get_drivers_for_season
-from src.model.model import get_weights, set_weights, recalculate_synergy
+from src.data_ingestion.openf1_async import get_drivers_for_season
+from src.model.model import FEATURES, load_saved_weights, get_weights, set_weights, recalculate_synergy, get_normalised_synergies, save_synergies, sample_weight_vectors, sweep_weights
+from src.model.model import model_versions, load_model, as_weights
+from src.model.pairings import predict_pairings
 from src.utils.plot_utils import DRIVER_SYNERGY_COLOR, BEST_SYNERGY_COLOR, AVG_SYNERGY_COLOR
 
-def get_historic_synergies():
-    data = pd.read_csv(r"data/historic_synergies/normalised_synergies.csv")
+def get_session_weights():
+    # Each session keeps its own immutable weights snapshot, starting from the last saved weights
+    if 'weights' not in st.session_state:
+        st.session_state['weights'] = load_saved_weights()
+    return st.session_state['weights']
+
+def get_historic_synergies(weights):
+    data = get_normalised_synergies(weights).copy()
     bins = [0, 30, 50, 70, 85, 100]
     labels = ['Very Poor', 'Poor', 'Moderate', 'Good', 'Excellent']
     data['SynergyLevel'] = pd.cut(data['SynergyScore'], bins=bins, labels=labels, right=True)
@@ -49,32 +59,87 @@ def plot_driver_synergies(driver, data):
     synergy_plot_df = synergy_plot_df.sort_index()
     st.line_chart(synergy_plot_df, color=[DRIVER_SYNERGY_COLOR, AVG_SYNERGY_COLOR, BEST_SYNERGY_COLOR])
 
-def show_weights():
-    weights = get_weights()
+def show_weights(weights):
+    weights = get_weights(weights)
     weight_metrics = list(weights.keys())
     cols = st.columns(len(weight_metrics))
     for index, metric in enumerate(weight_metrics):
         cols[index].metric(metric, weights[metric])
 
-def update_model_weights(text):
-    weight_list = [float(i) for i in text.split(',')]
-    set_weights(weight_list[0],weight_list[1],weight_list[2],weight_list[3],weight_list[4])
-    recalculate_synergy()
-    st.toast('Synergy Scores updated!')
+@st.cache_data
+def get_weight_sweep(count, spread, weights):
+    weight_vectors = sample_weight_vectors(count, spread, weights)
+    return sweep_weights(weight_vectors, weights)
+
+def show_weight_sensitivity(weights):
+    cols = st.columns(2)
+    count = cols[0].select_slider('Weight vectors', options=[100, 1000, 5000, 10000], value=1000)
+    spread = cols[1].slider('Spread around the current weights', min_value=0.1, max_value=1.5, value=0.5, step=0.1)
+    sweep = get_weight_sweep(count, spread, weights)
+
+    taus = pd.Series(sweep['kendall_tau'])
+    metric_cols = st.columns(3)
+    metric_cols[0].metric('Median Kendall tau', f'{taus.median():.3f}')
+    metric_cols[1].metric('Vectors with tau > 0.9', f'{(taus > 0.9).mean():.0%}')
+    metric_cols[2].metric('Lowest Kendall tau', f'{taus.min():.3f}')
+
+    plot_col1, plot_col2 = st.columns([1,2])
+    with plot_col1:
+        st.markdown('Kendall tau against the current weights')
+        tau_counts = pd.cut(taus, bins=np.linspace(-1, 1, 41)).value_counts().sort_index()
+        tau_counts.index = tau_counts.index.map(lambda interval: round(interval.mid, 2))
+        st.bar_chart(tau_counts)
+    with plot_col2:
+        st.markdown('Rank stability of the driver-seasons')
+        st.dataframe(sweep['stability'].drop(columns=['Driver', 'Season']))
+
+def show_pairings(weights):
+    if not model_versions():
+        st.info('No trained synergy model yet, train one with train_model or model_selection first')
+        return
+    season = st.selectbox('Pairings season', [datetime.today().year, datetime.today().year - 1])
+    # Cached per model version, so reruns only redraw the heatmap
+    pairings = predict_pairings(season)
+    if pairings.empty:
+        st.info(f'No ledger data for {season} yet')
+        return
+    model_weights = as_weights(load_model()['weights'])
+    if model_weights != as_weights(weights):
+        st.caption(f'Predicted with the weights the model was trained on ({dict(model_weights._asdict())}), '
+                   'retrain the model to predict with the current weights')
+    fig = go.Figure(go.Heatmap(z=pairings.to_numpy(), x=pairings.columns, y=pairings.index,
+                               colorscale='RdYlGn', zmin=0, zmax=100, colorbar={'title': 'Synergy'}))
+    fig.update_layout(height=40 * len(pairings) + 120, margin={'t': 20})
+    st.plotly_chart(fig, use_container_width=True)
+
+def update_model_weights():
+    # Rescoring is an in-memory matrix product, so it runs on every weight change
+    weight_list = [st.session_state[f'weight_{metric}'] for metric in FEATURES]
+    weights = set_weights(weight_list[0],weight_list[1],weight_list[2],weight_list[3],weight_list[4])
+    st.session_state['weights'] = weights
+    recalculate_synergy(weights)
+
+def save_synergy_scores():
+    save_synergies(get_session_weights())
+    st.toast('Synergy Scores saved!')
 
 drivers_list = get_latest_season_drivers()
-data = get_historic_synergies() 
 driver = st.sidebar.selectbox('Pick a driver', options=drivers_list)
-show_model_stats = st.sidebar.button('Show model stats')
+show_model_stats = st.sidebar.toggle('Show model stats')
 
-text = st.sidebar.text_input('weights')
-button = st.sidebar.button('Update model weights', on_click=update_model_weights, args=(text,))
+st.sidebar.markdown('Model weights')
+weights = get_session_weights()
+for metric, weight in get_weights(weights).items():
+    st.sidebar.number_input(metric, value=float(weight), step=0.1, key=f'weight_{metric}', on_change=update_model_weights)
+st.sidebar.button('Save synergy scores', on_click=save_synergy_scores)
+
+data = get_historic_synergies(st.session_state['weights'])
   
 if show_model_stats:
     st.dataframe(data)
     st.divider()
     st.markdown('Feature weights for the current model')
-    show_weights() 
+    show_weights(st.session_state['weights'])
     st.divider()
     plot_col1, plot_col2 = st.columns([1,2])
     with plot_col1:
@@ -86,3 +151,9 @@ if show_model_stats:
     st.divider()
     st.markdown('Driver Synergy levels compared to the best and average over the seasons')
     plot_driver_synergies(driver, data)
+    st.divider()
+    st.markdown('Sensitivity of the synergy ranking to the model weights')
+    show_weight_sensitivity(st.session_state['weights'])
+    st.divider()
+    st.markdown('Predicted synergy of every driver in every team (what-if pairings)')
+    show_pairings(st.session_state['weights'])
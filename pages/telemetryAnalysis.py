@@ -1,10 +1,16 @@
 import streamlit as st
 import fastf1
-import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
+import plotly.graph_objects as go
 
+from plotly.subplots import make_subplots
 from src.data_ingestion.openf1_loader import *
-from src.utils.plot_utils import TEAM_COLORS
+from src.data_ingestion.telemetry_store import ensure_timing, load_report
+from src.data_ingestion.telemetry_engine import compare_stored_fastest_laps, fastest_timed_laps
+from src.utils.plot_utils import TEAM_COLORS, downsample
+
+PANELS = [('Delta', 'Gap (s)'), ('Speed', 'Speed (km/h)'), ('Throttle', 'Throttle (%)'), ('Brake', 'Brake'),
+          ('nGear', 'Gear'), ('RPM', 'RPM')]
 
 
 # TO ADD
@@ -19,7 +25,50 @@ def adjust_color_brightness(hex_color, factor=0.8):
     """
     rgb = mcolors.to_rgb(hex_color)
     adjusted_rgb = tuple(min(max(c * factor, 0), 1) for c in rgb)
-    return adjusted_rgb
+    return mcolors.to_hex(adjusted_rgb)
+
+def driver_colors(drivers, timing):
+    # Team colour for each team's first driver, darker shades for their teammates
+    teams = timing.drop_duplicates('Driver').set_index('Driver')['Team']
+    colors, seen = [], {}
+    for driver in drivers:
+        team = teams.get(driver)
+        color = TEAM_COLORS.get(team, '#888888')
+        colors.append(adjust_color_brightness(color, factor=0.7 ** seen.get(team, 0)))
+        seen[team] = seen.get(team, 0) + 1
+    return colors
+
+@st.cache_data(show_spinner='Building the telemetry comparison...')
+def get_comparison_figure(season, selected_round, session_type, drivers:tuple, laps:tuple):
+    # One figure with a panel per channel on a shared distance axis. The laps are part of the cache key,
+    # so the figure is built once per comparison and reruns only send it to the browser again
+    comparison = compare_stored_fastest_laps(season, selected_round, session_type, list(drivers))
+    if comparison is None:
+        return None, {}
+
+    distance = comparison['Distance']
+    labels = comparison['Labels']
+    colors = driver_colors(labels, ensure_timing(season, selected_round, session_type))
+
+    fig = make_subplots(rows=len(PANELS), cols=1, shared_xaxes=True, vertical_spacing=0.02,
+                        row_heights=[1.2, 1.5, 1, 0.6, 0.8, 1])
+    for row, (channel, label) in enumerate(PANELS, start=1):
+        for index, driver in enumerate(labels):
+            x, y = downsample(distance, comparison[channel][index])
+            fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=driver, legendgroup=driver, showlegend=row == 1,
+                                     line=dict(color=colors[index], width=1.5 if index == 0 else 1.2)),
+                          row=row, col=1)
+        fig.update_yaxes(title_text=label, row=row, col=1)
+    fig.update_xaxes(title_text='Distance (m)', row=len(PANELS), col=1)
+    fig.update_layout(
+        height=1200,
+        hovermode='x unified',
+        title=f'Fastest laps, gap to {labels[0]}',
+        template='plotly_white'
+    )
+
+    tables = {name: comparison[name] for name in ['MinSpeed', 'BrakePoint'] if name in comparison}
+    return fig, tables
 
 if "season" not in st.session_state:
     st.session_state.season = 2023
@@ -55,88 +104,45 @@ with picker_col4:
     load_data = st.button('Compare telemetry')    
 
 
+# The comparison stays selected across reruns, so other widgets do not clear it
 if load_data:
+    st.session_state.telemetry_comparison = (season, selected_round, team)
+
+if st.session_state.get('telemetry_comparison'):
+    compared_season, compared_round, compared_team = st.session_state.telemetry_comparison
     try:
-        quali_session = fastf1.get_session(season, selected_round, 'Q')
-        quali_session.load()
+        # Timing and car data come from the memory-mapped telemetry store; the first time, only the timing
+        # and the compared laps' car data are loaded from fastf1
+        timing = ensure_timing(compared_season, compared_round, 'Q')
 
-        # Get drivers for selected team
-        team_drivers_df = quali_session.results[quali_session.results['TeamName'] == team]
-        drivers = team_drivers_df['Abbreviation'].values
+        # The team's drivers, plus any other drivers of the session to compare against
+        team_drivers = list(timing.loc[timing['Team'] == compared_team, 'Driver'].unique())
+        other_drivers = st.multiselect('Compare with', options=sorted(set(timing['Driver']) - set(team_drivers)))
 
-        if len(drivers) != 2:
-            st.error(f"Expected 2 drivers for {team}, but found {len(drivers)}. Check if both participated in quali.")
-        else:
-            driver1, driver2 = drivers
-            team_color = TEAM_COLORS[team]
-            darker_color = adjust_color_brightness(team_color, factor=0.7)
+        # Fastest laps from the timing, faster driver first
+        fastest = fastest_timed_laps(timing, team_drivers + other_drivers)
 
-            # Pick laps
-            laps_driver1 = quali_session.laps.pick_driver(driver1).pick_quicklaps()
-            laps_driver2 = quali_session.laps.pick_driver(driver2).pick_quicklaps()
+        if len(fastest) < 2:
+            st.error(f"Need at least 2 drivers with a valid quicklap in quali, found {len(fastest)}.")
+        else:
+            fig, tables = get_comparison_figure(compared_season, compared_round, 'Q', tuple(fastest['Driver']),
+                                                tuple(fastest['LapNumber'].astype(int)))
 
-            if laps_driver1.empty or laps_driver2.empty:
-                st.error(f"One or both drivers have no valid quicklaps in quali.")
+            if fig is None:
+                st.error("No car data for these drivers' quicklaps in quali.")
             else:
-                fastest_lap_driver1 = laps_driver1.pick_fastest()
-                fastest_lap_driver2 = laps_driver2.pick_fastest()
-
-                tel_driver1 = fastest_lap_driver1.get_car_data().add_distance()
-                tel_driver2 = fastest_lap_driver2.get_car_data().add_distance()
-
-                # --- Plot example: Speed vs Distance ---
-                fig, ax = plt.subplots(figsize=(10, 6))
-                ax.plot(tel_driver1['Distance'], tel_driver1['Speed'], label=driver1, color=team_color)
-                ax.plot(tel_driver2['Distance'], tel_driver2['Speed'], label=driver2, color=darker_color, alpha=0.7)
-
-                ax.set_xlabel("Distance (m)")
-                ax.set_ylabel("Speed (km/h)")
-                ax.legend()
-                ax.grid(True)
-
-                st.pyplot(fig)
-
-
-            # Throttle plot
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(tel_driver1['Distance'], tel_driver1['Throttle'], label=driver1)
-            ax.plot(tel_driver2['Distance'], tel_driver2['Throttle'], label=driver2)
-            ax.set_xlabel("Distance (m)")
-            ax.set_ylabel("Throttle (%)")
-            ax.legend()
-            ax.grid(True)
-            st.pyplot(fig)
-
-
-            # Braking plot
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(tel_driver1['Distance'], tel_driver1['Brake'], label=driver1)
-            ax.plot(tel_driver2['Distance'], tel_driver2['Brake'], label=driver2)
-            ax.set_xlabel("Distance (m)")
-            ax.set_ylabel("Brake (boolean)")
-            ax.legend()
-            ax.grid(True)
-            st.pyplot(fig)
-
-            # Gear plot
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(tel_driver1['Distance'], tel_driver1['nGear'], label=driver1)
-            ax.plot(tel_driver2['Distance'], tel_driver2['nGear'], label=driver2)
-            ax.set_xlabel("Distance (m)")
-            ax.set_ylabel("Gear")
-            ax.legend()
-            ax.grid(True)
-            st.pyplot(fig)
-
-            # RPM plot
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.plot(tel_driver1['Distance'], tel_driver1['RPM'], label=driver1)
-            ax.plot(tel_driver2['Distance'], tel_driver2['RPM'], label=driver2)
-            ax.set_xlabel("Distance (m)")
-            ax.set_ylabel("RPM")
-            ax.legend()
-            ax.grid(True)
-            st.pyplot(fig)
+                report = load_report(compared_season, compared_round, 'Q')
+                if report is not None and report['selective']:
+                    st.caption(f"Decoded {report['bytes_decoded'] / 1e6:.1f} of {report['bytes_total'] / 1e6:.1f} MB of car data "
+                               f"in {report['seconds']:.1f}s, about {report['estimated_seconds_saved']:.1f}s less than a full load")
+
+                st.plotly_chart(fig, use_container_width=True)
+
+                if tables:
+                    st.markdown('Minimum speed per corner (km/h)')
+                    st.dataframe(tables['MinSpeed'].round(1))
+                    st.markdown('Brake point per corner (m)')
+                    st.dataframe(tables['BrakePoint'])
 
     except Exception as e:
-        st.error(f"Failed to load session: {e}")
\ No newline at end of file
+        st.error(f"Failed to load session: {e}")
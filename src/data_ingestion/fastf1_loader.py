@@ -1,9 +1,11 @@
 # Responsible for loading the data from the FastF1 Python package
 import fastf1
 import pandas as pd
-import time
 from datetime import timedelta, datetime
 
+from src.data_ingestion.session_cache import get_cached_session
+from src.data_ingestion.results_store import ensure_seasons, read_results
+
 fastf1.logger.set_log_level('ERROR')
 
 DNF_STATUSES = ['Collision damage', 'Hydraulics', 'Radiator', 'Collision', 'Retired', 'Did not start', 'Mechanical', 'Electronics']
@@ -35,13 +37,12 @@ def format_session_type(session_type):
 
     return session_type_formatted
 
-def load_session_data(season, round_name, session_type):
+def load_session_data(season, round_name, session_type, profile:str = 'laps-no-telemetry'):
 
     session_type_formatted = format_session_type(session_type)
     try:
-        session = fastf1.get_session(season, round_name, session_type_formatted)
-        session.load()
-        return session
+        # Sessions are shared through the process-wide cache, so helpers must not modify them in place
+        return get_cached_session(season, round_name, session_type_formatted, profile)
     except Exception as e:
         print(f'Error loading session: {e}')
         return None
@@ -103,7 +104,7 @@ def get_session_top5_drivers_laps(season, selected_round, session_type):
 
 def get_session_tyre_distribution(season, selected_round, session_type):
     session = load_session_data(season, selected_round, session_type)
-    laps = session.laps
+    laps = session.laps.copy()
     laps['LapTimeSeconds'] = laps['LapTime'].dt.total_seconds()
     grouped_laps = laps.groupby('Compound')
 
@@ -162,23 +163,14 @@ def get_session_tyre_distribution(season, selected_round, session_type):
 
 def get_distinct_drivers(first_season = 2018, last_season = 2025):
 
-    all_drivers = set()
-
-    for season in range(last_season, first_season - 1, -1):
-        try:
-            schedule = fastf1.get_event_schedule(season)
-        except Exception as e:
-            print(f'Skipping season {season}: {e}')
-
-        print(f'Processing season {season}...')
-
-        season_opener = fastf1.get_event(season, 1)
-        season_opener_race = season_opener.get_race()
-        season_opener_race.load(telemetry=False, weather=False, messages=False, livedata=False)
-        drivers = season_opener_race.results['FullName']
-        all_drivers.update(drivers)
+    seasons = range(first_season, last_season + 1)
+    ensure_seasons(seasons)
 
-    return sorted(all_drivers)
+    # Drivers on the grid at each season opener
+    season_openers = read_results(seasons, 'R', rounds=[1], columns=['FullName'])
+    if season_openers.empty:
+        return []
+    return sorted(season_openers['FullName'].dropna().unique())
 
 def get_events_for_season(season:int = 2025):
     schedule = fastf1.get_event_schedule(season)
@@ -204,8 +196,7 @@ def get_average_quali_pos(driver:str = None, season:int = 2025, season_races:lis
     for race in season_races:
 
         # Load quali session
-        quali = fastf1.get_session(season, race, 'Q')
-        quali.load()
+        quali = get_cached_session(season, race, 'Q', 'results-only')
         
         quali_results = quali.results
         for index, row in quali_results.iterrows():
@@ -246,166 +237,128 @@ def calculate_quali_teammate_delta(driver_res, teammate_res):
     if abs(delta_seconds ) > 5: return 0.0
     return delta_seconds
 
+RESULTS_FRAME_KEYS = ['Season', 'Round', 'FullName']
+
+def build_results_frame(starting_season:int = 2018, last_season:int = 2025) -> pd.DataFrame:
+    # One row per driver per race, with the driver's and their teammate's race and qualifying results side by side
+    seasons = range(starting_season, last_season+1)
+    ensure_seasons(seasons)
+    races = read_results(seasons, 'R', columns=RESULTS_FRAME_KEYS + ['EventName', 'TeamName', 'TeamId', 'Position', 'Points', 'Status'])
+    qualis = read_results(seasons, 'Q', columns=RESULTS_FRAME_KEYS + ['Q1', 'Q2', 'Q3'])
+    if races.empty:
+        return races
+
+    # Best qualifying time is the one from the last part of qualifying the driver took part in
+    qualis['QualiBest'] = qualis['Q3'].fillna(qualis['Q2']).fillna(qualis['Q1'])
+    frame = races.merge(qualis[RESULTS_FRAME_KEYS + ['QualiBest']], on=RESULTS_FRAME_KEYS, how='left')
+
+    # Pair every driver with their teammate in the same race
+    teammates = frame[['Season', 'Round', 'TeamId', 'FullName', 'Position', 'QualiBest']].rename(columns={
+        'FullName': 'TeammateName',
+        'Position': 'TeammatePosition',
+        'QualiBest': 'TeammateQualiBest'
+    })
+    pairs = frame[RESULTS_FRAME_KEYS + ['TeamId']].merge(teammates, on=['Season', 'Round', 'TeamId'])
+    pairs = pairs.loc[pairs['TeammateName'] != pairs['FullName']].drop_duplicates(RESULTS_FRAME_KEYS)
+    frame = frame.merge(pairs.drop(columns='TeamId'), on=RESULTS_FRAME_KEYS, how='left')
+
+    has_teammate = frame['TeammateName'].notna()
+    frame['IsDNF'] = frame['Status'].isin(DNF_STATUSES)
+    frame['IsFinished'] = frame['Status'].isin(FINISHED_STATUSES)
+    frame['IsWin'] = frame['Position'] == 1
+    frame['IsPodium'] = frame['Position'].between(1, 3)
+    frame['RaceFor'] = has_teammate & (frame['Position'] < frame['TeammatePosition'])
+    frame['RaceAgainst'] = has_teammate & ~frame['RaceFor']
+
+    # Invalid quali deltas (driver or teammate missing a time, or a gap over 5s) are left out
+    # does not take into consideration weather changes (ex: Canada 2023)
+    quali_delta = (frame['QualiBest'] - frame['TeammateQualiBest']).dt.total_seconds()
+    valid_delta = has_teammate & quali_delta.notna() & (quali_delta != 0) & (quali_delta.abs() <= 5)
+    frame['QualiDelta'] = quali_delta.where(valid_delta)
+    frame['QualiFor'] = valid_delta & (quali_delta < 0)
+    frame['QualiAgainst'] = valid_delta & (quali_delta > 0)
+
+    return frame.sort_values(['Season', 'Round']).reset_index(drop=True)
+
+def compute_driver_profiles(results_frame:pd.DataFrame, drivers:list = None) -> dict:
+    # Profiles (KPIs, Results and per-season Comparisons) for every driver in the frame, or only the ones requested
+    if drivers is not None:
+        results_frame = results_frame.loc[results_frame['FullName'].isin(drivers)]
+    if results_frame.empty:
+        return {}
+
+    by_driver = results_frame.groupby('FullName')
+    kpis = by_driver.agg(
+        TotalRaces=('Round', 'size'),
+        Finished=('IsFinished', 'sum'),
+        DNFs=('IsDNF', 'sum'),
+        Wins=('IsWin', 'sum'),
+        Podiums=('IsPodium', 'sum'),
+        Points=('Points', 'sum')
+    )
+    teams = by_driver['TeamName'].unique()
+
+    comparisons = (
+        results_frame
+        .groupby(['FullName', 'Season'])
+        .agg(
+            QualiDelta=('QualiDelta', 'mean'),
+            QualiCount=('QualiDelta', 'count'),
+            QualiFor=('QualiFor', 'sum'),
+            QualiAgainst=('QualiAgainst', 'sum'),
+            RaceFor=('RaceFor', 'sum'),
+            RaceAgainst=('RaceAgainst', 'sum')
+        )
+        .reset_index()
+    )
+    comparisons = comparisons.loc[comparisons['QualiCount'] != 0].drop(columns='QualiCount')
+    comparisons_by_driver = dict(tuple(comparisons.groupby('FullName')))
+
+    results_columns = ['Season', 'EventName', 'TeamName', 'Position', 'Points']
+    results_by_driver = dict(tuple(results_frame[['FullName'] + results_columns].groupby('FullName')))
+
+    profiles = {}
+    for driver, driver_kpis in kpis.iterrows():
+        profile = {kpi: int(value) for kpi, value in driver_kpis.items() if kpi != 'Points'}
+        profile['Points'] = driver_kpis['Points']
+        profile['Teams'] = set(teams[driver])
+        profile['Results'] = (
+            results_by_driver[driver][results_columns]
+            .rename(columns={'EventName': 'RaceName'})
+            .reset_index(drop=True)
+        )
+        driver_comparisons = comparisons_by_driver.get(driver, comparisons.iloc[0:0])
+        profile['Comparisons'] = driver_comparisons.drop(columns='FullName').reset_index(drop=True)
+        profiles[driver] = profile
+
+    return profiles
+
+def get_all_driver_profiles(starting_season:int = 2018, last_season:int = 2025) -> dict:
+    from src.data_ingestion.feature_store import results_frame
+    return compute_driver_profiles(results_frame(starting_season, last_season))
+
 def get_driver_full_info(driver:str = None, starting_season:int = 2018, last_season:int = 2025):
-    driver_info = {
-        'TotalRaces' : 0,
-        'Finished': 0,
-        'DNFs': 0,
-        'Wins': 0,
-        'Podiums': 0,
-        'Points': 0,
-        'Teams': set()
-    }
-
-    results = []
-    teammate_comparisons = []
-
-    for year in range(starting_season, last_season+1):
-        quali_count = 0
-        quali_delta = 0
-        quali_for = 0
-        quali_against = 0
-        race_for = 0
-        race_against = 0
-        try:
-            schedule = fastf1.get_event_schedule(year)
-        except Exception as e:
-            print(f'Failed to get schedule for year {year}')
-        for _, event in schedule.iterrows():
-            # Skip over testing sessions
-            if event['EventFormat'] == 'testing':
-                continue
-
-            # Skip over events in the future
-            if event['EventDate'] > datetime.today():
-                continue
-
-            # Get the race event and load the results
-            event_race = event.get_race()
-            event_race.load(laps=False, telemetry=False, weather=False, messages=False, livedata=False)
-            race_results = event_race.results
-            driver_result = race_results.loc[race_results['FullName'] == driver]
-
-            # Skip events in which the driver was not part of the race
-            if driver_result.empty:
-                print(f'Driver did not participate in this event! - {event['EventName']} - {year}')
-                continue
-
-            # Process general race stats
-            driver_result = driver_result.iloc[0]
-
-            driver_info['TotalRaces'] += 1 # Total Races
-
-            # race status
-            status = driver_result['Status']
-            if status in DNF_STATUSES:
-                driver_info['DNFs'] += 1 # DNF Races
-            if status in FINISHED_STATUSES:
-                driver_info['Finished'] += 1 # Finished Races
-
-            # race position
-            position = driver_result['Position']
-            if position == 1:
-                driver_info['Wins'] += 1 # Race Wins
-            if position >= 1 and position <= 3:
-                driver_info['Podiums'] += 1  # Race Podiums
-
-            # total points
-            points = driver_result['Points']
-            driver_info['Points'] += points
-
-            # team
-            team = driver_result['TeamName']
-            driver_info['Teams'].add(team)
-
-
-            # driver results list
-            team_name = driver_result['TeamName']
-            results.append({
-                'Season': year,
-                'RaceName': event['EventName'],
-                'TeamName': driver_result['TeamName'],
-                'Position': position,
-                'Points': points
-            })
-
-            # Calculate race H2H with teammate
-            team_id = driver_result['TeamId'] # Team ID for better data gathering
-
-            # Get the result of the teammate
-            teammate_race_result = race_results.loc[(race_results['TeamId'] == team_id) & (race_results['FullName'] != driver)]
-            if teammate_race_result.empty:
-                print(f'Teammate did not participate in the race - {event['EventName']} - {year}')
-                continue
-            teammate_race_result = teammate_race_result.iloc[0]
-
-            # Compute race position delta
-            race_diff = driver_result['Position'] - teammate_race_result['Position']
-            if race_diff < 0 : race_for += 1
-            else : race_against += 1
-
-            time.sleep(0.5) # sleep to avoid overloading the API call
-
-            # Load qualifying session
-            event_quali = event.get_qualifying()
-            event_quali.load(laps=False, telemetry=False, weather=False, messages=False, livedata=False)
-            quali_results = event_quali.results
-
-            # Get driver quali result
-            driver_quali_result = quali_results.loc[quali_results['FullName'] == driver]
-            if driver_quali_result.empty:
-                print(f'Driver did not participate in this Quali, but raced - {event['EventName']} - {year}')
-                continue
-            driver_quali_result = driver_quali_result.iloc[0]
-
-            # Get teammate quali result
-            teammate_quali_result = quali_results.loc[(quali_results['TeamId'] == team_id) & (quali_results['FullName'] != driver)]
-            if teammate_quali_result.empty:
-                print(f'Teammate did not participate in this Quali, but raced - {event['EventName']} - {year}')
-                continue
-            teammate_quali_result = teammate_quali_result.iloc[0]
-
-            # Calculate quali delta
-            teammate_delta = calculate_quali_teammate_delta(driver_quali_result, teammate_quali_result)
-            # Invalid quali deltas are marked with 0 (teammate or driver did not take part in Q, or delta > 5s)
-            # does not take into consideration weather changes (ex: Canada 2023)
-            if teammate_delta != timedelta(seconds=0).total_seconds():
-                if teammate_delta > pd.Timedelta(0).total_seconds() : quali_against += 1
-                else: quali_for += 1
-                quali_count += 1
-                quali_delta += teammate_delta
-
-        if quali_count != 0:
-            teammate_comparisons.append({
-                'Season': year,
-                'QualiDelta': quali_delta / quali_count,
-                'QualiFor': quali_for,
-                'QualiAgainst': quali_against,
-                'RaceFor': race_for,
-                'RaceAgainst': race_against
-            })    
-
-
-    results_df = pd.DataFrame(results)
-    driver_info['Results'] = results_df
-
-    comparisons_df = pd.DataFrame(teammate_comparisons)
-    driver_info['Comparisons'] = comparisons_df
-    return driver_info
+    from src.data_ingestion.feature_store import results_frame as feature_results_frame
+    results_frame = feature_results_frame(starting_season, last_season)
+    profile = compute_driver_profiles(results_frame, [driver]).get(driver)
+    if profile is None:
+        # Driver did not take part in any race in the selected seasons
+        profile = {
+            'TotalRaces' : 0,
+            'Finished': 0,
+            'DNFs': 0,
+            'Wins': 0,
+            'Podiums': 0,
+            'Points': 0,
+            'Teams': set(),
+            'Results': pd.DataFrame(),
+            'Comparisons': pd.DataFrame()
+        }
+    return profile
 
 def compute_lap_deviation(laps, driver):
-    # Get laps for the selected driver
-    driver_laps = laps.pick_drivers(driver)
-
-    # Convert laptime from Timedelta to seconds
-    driver_laps['LapTimeSeconds'] = driver_laps['LapTime'].dt.total_seconds()
-    # Filter valid laps only (not in lap, out lap, and laptimes must be accurate)
-    clean_laps = driver_laps[
-        driver_laps['PitInTime'].isnull() & 
-        driver_laps['PitOutTime'].isnull() & 
-        driver_laps['IsAccurate'] & 
-        driver_laps['LapTime'].notnull()
-    ]['LapTimeSeconds']
+    # Laps are expected in the cleaned warehouse format (see results_store.clean_laps)
+    clean_laps = laps.loc[(laps['Driver'] == driver) & laps['IsClean'], 'LapTimeSeconds']
     if clean_laps.empty:
         return 0
     # Perform simple standard deviation
@@ -417,14 +370,7 @@ def compute_average_laptime(laps, driver_list):
     driver_averages = []
 
     for driver in driver_list:
-        driver_laps = laps.pick_drivers(driver)
-        driver_laps['LapTimeSeconds'] = driver_laps['LapTime'].dt.total_seconds()
-        clean_laps = driver_laps[
-        driver_laps['PitInTime'].isnull() & 
-        driver_laps['PitOutTime'].isnull() & 
-        driver_laps['IsAccurate'] & 
-        driver_laps['LapTime'].notnull()
-        ]['LapTimeSeconds']
+        clean_laps = laps.loc[(laps['Driver'] == driver) & laps['IsClean'], 'LapTimeSeconds']
 
         if clean_laps.empty:
             return [0 ,0]
@@ -432,191 +378,47 @@ def compute_average_laptime(laps, driver_list):
         driver_averages.append(laps_avg)
     return driver_averages
 
-def get_synergy_metrics(driver:str = None, season:int = 2025):
+def compute_session_driver_metrics(laps:pd.DataFrame, results:pd.DataFrame) -> pd.DataFrame:
+    # Per-driver clean-lap count, mean, standard deviation and mean delta to the teammate, for one session
+    # (or several, when laps and results carry Season/Round columns), in a single pass over the laps.
+    # Laps are expected in the cleaned warehouse format (see results_store.clean_laps).
+    keys = [column for column in ['Season', 'Round'] if column in results.columns and column in laps.columns]
 
-    synergy_results = {}
-    qualifying_positions = {}
-    race_positions = {}
-    lap_deltas = {}
-
-    quali_pos = 0
-    quali_count = 0
-
-    race_count = 0
-    race_sum = 0
-
-    dnf_count = 0
-
-    total_deviation = 0
-    deviation_calculated_races = 0
-
-    total_lap_delta = 0
-    delta_calculated_races = 0
-    driver_team_color = ''
-
-    for round in range (1, 25):
-        try:
-
-            # Load Round's Qualifying
-            quali = fastf1.get_session(season, round, 'Q')
-            if quali.date > datetime.today():
-                continue
-            quali.load(laps=False, telemetry=False, weather=False, messages=False, livedata=False)
-            quali_results = quali.results # Get Quali results
-            driver_quali = quali_results.loc[quali_results['FullName'] == driver] # Get Driver Quali data
-            driver_quali = driver_quali.iloc[0]
-            # Qualifying-related stats
-            quali_pos += driver_quali['Position']   # add quali positions
-            quali_count += 1                        # count qualifiers
-            qualifying_positions[round] = int(driver_quali['Position']) # add quali pos to dict (for visualisations)
-        except Exception as e:
-            print(f'Error for quali round {round}: {str(e)}')
-
-        try:
-            # Load Round's Race
-            race = fastf1.get_session(season, round, 'R')
-            if race.date > datetime.today():
-                continue
-            race.load()
-            race_results = race.results # Get Race results
-            driver_race = race_results.loc[race_results['FullName'] == driver] # Get Driver Race data
-
-            if driver_race.empty:
-                continue
-
-            driver_race = driver_race.iloc[0]
-            # Race related stats
-            race_pos = driver_race['Position']
-            race_sum += race_pos
-            # race_start = driver_race['GridPosition']
-            race_status = driver_race['Status']
-            race_positions[round] = int(race_pos)
-            if race_status in DNF_STATUSES:
-                dnf_count += 1
-            race_count += 1
-
-            driver_team_color = driver_race['TeamColor']
-
-            # Compute race lap deviation
-            laps = race.laps
-            driver_abbr = driver_race['Abbreviation']
-            lap_deviation = compute_lap_deviation(laps, driver_abbr)
-            if lap_deviation != 0:
-                total_deviation += lap_deviation
-                deviation_calculated_races += 1
-
-            # Compute race lap delta to teammate
-            team_id = driver_race['TeamId']
-            teammate_race = race_results.loc[(race_results['TeamId'] == team_id) & (race_results['FullName'] != driver)]
-            if teammate_race.empty:
-                print('No teammate raced')
-                continue
-            teammate_race = teammate_race.iloc[0]
-            teammate_abbr = teammate_race['Abbreviation']
-
-            driver_avg_lap, teammate_avg_lap = compute_average_laptime(laps, [driver_abbr, teammate_abbr])
-            race_delta = driver_avg_lap - teammate_avg_lap
-            if race_delta != 0:
-                total_lap_delta += race_delta
-                delta_calculated_races += 1
-            lap_deltas[round] = race_delta
-
-        except Exception as e:
-            print(f'Error for race round {round}: {str(e)}')
-
-    synergy_results['Teammate_delta'] = total_lap_delta / delta_calculated_races
-    synergy_results['Lap_stdev'] = total_deviation/deviation_calculated_races
-    synergy_results['Avg_Q'] = quali_pos/quali_count
-    synergy_results['Avg_R'] = race_sum/race_count
-    synergy_results['DNFRate'] = (dnf_count * 100) / race_count
-    synergy_results['Q_positions'] = qualifying_positions
-    synergy_results['R_positions'] = race_positions
-    synergy_results['RaceLapDeltas'] = lap_deltas
-    synergy_results['Color'] = driver_team_color
-
-    return synergy_results
+    clean = laps.loc[laps['IsClean'].astype(bool), keys + ['Driver', 'LapTimeSeconds']] if not laps.empty else None
+    if clean is None or clean.empty:
+        lap_stats = pd.DataFrame(columns=keys + ['Driver', 'CleanLaps', 'LapMean', 'LapStd'])
+    else:
+        lap_stats = (
+            clean
+            .groupby(keys + ['Driver'])['LapTimeSeconds']
+            .agg(CleanLaps='count', LapMean='mean', LapStd='std')
+            .reset_index()
+        )
+
+    # Every classified driver gets a row, even without clean laps
+    drivers = results[keys + ['Abbreviation', 'TeamId']].rename(columns={'Abbreviation': 'Driver'})
+    metrics = drivers.merge(lap_stats, on=keys + ['Driver'], how='left')
+    metrics['CleanLaps'] = metrics['CleanLaps'].fillna(0).astype(int)
+
+    # Teammates through a self-join on TeamId within the same session
+    teammates = metrics[keys + ['TeamId', 'Driver', 'LapMean']].rename(columns={'Driver': 'Teammate', 'LapMean': 'TeammateLapMean'})
+    pairs = metrics[keys + ['TeamId', 'Driver']].merge(teammates, on=keys + ['TeamId'])
+    pairs = pairs.loc[pairs['Teammate'] != pairs['Driver']].drop_duplicates(keys + ['Driver'])
+    metrics = metrics.merge(pairs.drop(columns='TeamId'), on=keys + ['Driver'], how='left')
+
+    # Missing when either driver has no clean laps
+    metrics['TeammateDelta'] = metrics['LapMean'] - metrics['TeammateLapMean']
+    return metrics.set_index(keys + ['Driver'])
+
+def get_synergy_metrics(driver:str = None, season:int = 2025):
+    # Read from the feature store, which is filled once per round from the contribution ledger
+    from src.data_ingestion.feature_store import driver_season_metrics
+    return driver_season_metrics(driver, season)
 
 def get_synergy_metrics_for_drivers(drivers:list = [], season:int = 2025):
-    
-    drivers_synergies = {f'{driver}' : {
-        'Teammate_delta': 0,
-        'Lap_stdev': 0,
-        'Avg_Q': 0,
-        'Avg_R': 0,
-        'DNFRate': 0,
-        'total_lap_delta': 0,
-        'delta_calculated_races': 0,
-        'total_deviation': 0,
-        'deviation_calculated_races': 0,
-        'quali_pos': 0,
-        'quali_count': 0,
-        'race_sum': 0,
-        'race_count': 0,
-        'dnf_count': 0
-    } for driver in drivers} 
-    for round in range(1,25):
-        try:
-            quali = fastf1.get_session(season, round, 'Q')
-            race = fastf1.get_session(season, round, 'R')
-            if quali.date < datetime.today():
-                quali.load(laps=False, telemetry=False, weather=False, messages=False, livedata=False)
-                q_results = quali.results
-                for driver in drivers:
-                    driver_q = q_results.loc[q_results['FullName'] == driver] # Get Driver Quali data
-                    if not driver_q.empty:
-                        driver_q = driver_q.iloc[0]
-                        driver_dict = drivers_synergies.get(driver)
-                        driver_dict['quali_pos'] += driver_q['Position']
-                        driver_dict['quali_count'] += 1
-            
-            if race.date < datetime.today():
-                race.load()
-                laps = race.laps
-                r_results = race.results
-                for driver in drivers:
-                    driver_r = r_results.loc[r_results['FullName'] == driver]
-                    if not driver_r.empty:
-                        driver_r = driver_r.iloc[0]
-                        driver_dict = drivers_synergies.get(driver)
-                        driver_dict['race_sum'] += driver_r['Position']
-                        race_status = driver_r['Status']
-                        if race_status in DNF_STATUSES:
-                            driver_dict['dnf_count'] += 1
-                        driver_dict['race_count'] += 1
-
-                        driver_abbr = driver_r['Abbreviation']
-                        lap_deviation = compute_lap_deviation(laps, driver_abbr)
-                        if lap_deviation != 0:
-                            driver_dict['total_deviation'] += lap_deviation
-                            driver_dict['deviation_calculated_races'] += 1
-
-                        team_id = driver_r['TeamId']
-                        teammate_r = r_results.loc[(r_results['TeamId'] == team_id) & (r_results['FullName'] != driver)]
-                        if not teammate_r.empty:
-                            teammate_r = teammate_r.iloc[0]
-                            teammate_abbr = teammate_r['Abbreviation']
-                            driver_avg_lap, teammate_avg_lap = compute_average_laptime(laps, [driver_abbr, teammate_abbr])
-                            race_delta = driver_avg_lap - teammate_avg_lap
-                            if race_delta != 0:
-                                driver_dict['total_lap_delta'] += race_delta
-                                driver_dict['delta_calculated_races'] += 1
-        except Exception as e:
-            print('Moving Forward')
-            continue
-
-    for driver in drivers:
-        driver_dict = drivers_synergies.get(driver)
-        if driver_dict['delta_calculated_races'] != 0:
-            driver_dict['Teammate_delta'] = driver_dict['total_lap_delta'] / driver_dict['delta_calculated_races']
-        if driver_dict['deviation_calculated_races'] != 0:
-            driver_dict['Lap_stdev'] = driver_dict['total_deviation'] / driver_dict['deviation_calculated_races']
-        if driver_dict['quali_count'] != 0:
-            driver_dict['Avg_Q'] = driver_dict['quali_pos'] / driver_dict['quali_count']
-        if driver_dict['race_count'] != 0: 
-            driver_dict['Avg_R'] = driver_dict['race_sum'] / driver_dict['race_count']
-            driver_dict['DNFRate'] = (driver_dict['dnf_count'] * 100) / driver_dict['race_count']
-
-    return drivers_synergies
+    # Season aggregates come from the same store; it builds on this module, hence the late import
+    from src.data_ingestion.feature_store import season_synergies
+    return season_synergies(drivers, season)
 
 def compute_synergy_score(metrics: dict) -> float:
     score = (
@@ -629,54 +431,10 @@ def compute_synergy_score(metrics: dict) -> float:
     return score
 
 def get_driver_synergy_per_race(drivername:str=None, starting_season:int=2020, final_season:int=2025):
-    drivername = 'Lewis Hamilton'
-    driver_synergies = []
-    for year in range(2021, 2025):
-        events = fastf1.get_event_schedule(year)
-        for race_index, event in events.iterrows():
-            if event['EventFormat'] != 'testing':
-                race = event.get_race()
-                race.load()
-                race_results = race.results
-                driver_res = race_results.loc[race_results['FullName'] == drivername]
-                if not driver_res.empty:
-
-                    stats = {
-                        'Teammate_delta' : 0,
-                        'Lap_stdev': 0,
-                        'Avg_Q': 0,
-                        'Avg_R': 0,
-                        'DNFRate': 0
-                    }
-
-                    driver_res = driver_res.iloc[0]
-                    team_id = driver_res['TeamId']
-
-                    teammate_res = race_results.loc[(race_results['TeamId'] == team_id) & (race_results['FullName'] != drivername)]
-                    if teammate_res.empty:
-                        continue
-                    teammate_res = teammate_res.iloc[0]
-
-                    teammate_abbr = teammate_res['Abbreviation']
-                    driver_abbr = driver_res['Abbreviation']
-                    race_laps = race.laps
-                    driver_avg, teammate_avg = compute_average_laptime(race_laps, [driver_abbr, teammate_abbr])
-                    driver_stdev = compute_lap_deviation(race_laps, driver_abbr)
-                    stats['Lap_stdev'] = driver_stdev
-                    race_delta = driver_avg - teammate_avg
-                    if race_delta != 0:
-                        stats['Teammate_delta'] = race_delta
-                    stats['Avg_Q'] = driver_res['GridPosition']
-                    stats['Avg_R'] = driver_res['Position']
-                    if driver_res['Status'] in DNF_STATUSES: stats['DNFRate'] = 1
-                    else: stats['DNFRate'] = 0
-
-                    synergy = compute_synergy_score(stats)
-                    stats['Season'] = year
-                    stats['Round'] = race_index
-                    stats['Synergy'] = synergy
-                    driver_synergies.append(stats)
-    return driver_synergies
+    # Read from the all-driver timeline, which builds the races it is missing in one pass for the whole grid
+    from src.data_ingestion.synergy_timeline import TIMELINE_STATS, get_synergy_timeline
+    timeline = get_synergy_timeline(starting_season, final_season, [drivername])
+    return timeline[TIMELINE_STATS + ['Season', 'Round', 'Synergy']].to_dict('records')
 
 
 
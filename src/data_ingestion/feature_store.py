@@ -0,0 +1,195 @@
+# Feature store: one typed row per (driver, season, round) with every feature the pages and the model use
+# (positions, DNFs, lap consistency, teammate race and qualifying deltas). It is filled once per round from
+# the synergy ledger and the results frame, persisted in the warehouse, and served from memory afterwards.
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from src.data_ingestion.fastf1_loader import build_results_frame
+from src.data_ingestion.results_store import (CURRENT_SEASON_REFRESH, stored_rounds, write_features, feature_rounds, read_feature_rows,
+                                              feature_fingerprints, save_feature_fingerprints)
+from src.data_ingestion.synergy_engine import contributions_to_partials, finalise_synergies
+from src.data_ingestion.synergy_ledger import read_ledger
+
+SYNERGY_METRICS = ['Teammate_delta', 'Lap_stdev', 'Avg_Q', 'Avg_R', 'DNFRate']
+
+# Column -> dtype of every stored feature; Season and Round are the partition keys
+FEATURE_SCHEMA = {
+    'Driver': 'string',
+    'Abbreviation': 'string',
+    'TeamName': 'string',
+    'TeamColor': 'string',
+    'EventName': 'string',
+    'QualiPosition': 'float32',
+    'RacePosition': 'float32',
+    'Points': 'float32',
+    'Status': 'string',
+    'DNF': 'bool',
+    'IsFinished': 'bool',
+    'IsWin': 'bool',
+    'IsPodium': 'bool',
+    'LapStdev': 'float32',
+    'Teammate': 'string',
+    'TeammateName': 'string',
+    'TeammatePosition': 'float32',
+    'TeammateDelta': 'float32',
+    'RaceFor': 'bool',
+    'RaceAgainst': 'bool',
+    'QualiDelta': 'float32',
+    'QualiFor': 'bool',
+    'QualiAgainst': 'bool'
+}
+KEYS = ['Driver', 'Season', 'Round']
+
+_frames = {}        # season -> (filled at, features indexed by KEYS)
+_lock = threading.Lock()
+
+def _typed(features:pd.DataFrame) -> pd.DataFrame:
+    features = features.copy()
+    for column, dtype in FEATURE_SCHEMA.items():
+        if column not in features.columns:
+            features[column] = pd.NA
+        if dtype == 'bool':
+            features[column] = features[column].fillna(False)
+        features[column] = features[column].astype(dtype)
+    return features
+
+def build_season_features(season, ledger:pd.DataFrame = None) -> pd.DataFrame:
+    # Joins the ledger's per-round contributions with the results frame's race and qualifying comparisons
+    ledger = read_ledger([season]) if ledger is None else ledger
+    ledger = ledger.astype({'Season': int, 'Round': int})
+    frame = build_results_frame(season, season)
+    if frame.empty:
+        return _typed(ledger)
+
+    frame = frame.rename(columns={'FullName': 'Driver', 'IsDNF': 'DNF', 'Position': 'RacePosition'})
+    frame = frame.drop(columns=['TeamId', 'QualiBest', 'TeammateQualiBest'])
+    features = ledger.merge(frame, on=KEYS, how='outer', suffixes=('', '_results'))
+    for column in ['TeamName', 'DNF']:
+        features[column] = features[column].where(features[column].notna(), features.pop(f'{column}_results'))
+    # Race positions come from the results, so races missing from the ledger still count
+    results_position = features.pop('RacePosition_results')
+    features['RacePosition'] = results_position.where(results_position.notna(), features['RacePosition'])
+    return _typed(features)
+
+def _ledger_fingerprints(ledger:pd.DataFrame) -> dict:
+    # One hash per round of its ledger rows, to spot rounds whose contributions changed after their features were built
+    return {str(round_number): str(int(pd.util.hash_pandas_object(rows.sort_values('Driver'), index=False).sum()))
+            for round_number, rows in ledger.groupby('Round')}
+
+def fill_feature_store(seasons, overwrite=False) -> int:
+    # Rounds missing from the store, or whose ledger rows changed, are (re)written; returns how many were written.
+    # Reading the ledger ingests the seasons' missing rounds first
+    written = 0
+    for season in seasons:
+        ledger = read_ledger([season])
+        fingerprints = _ledger_fingerprints(ledger)
+        stored_fingerprints = feature_fingerprints(season)
+        stored = set(feature_rounds(season))
+        rounds = set(stored_rounds(season))
+        missing = rounds if overwrite else {round_number for round_number in rounds if round_number not in stored
+                                            or stored_fingerprints.get(str(round_number)) != fingerprints.get(str(round_number))}
+        if not missing:
+            continue
+        features = build_season_features(season, ledger)
+        for round_number in sorted(missing):
+            round_features = features.loc[features['Round'] == round_number]
+            if not round_features.empty:
+                write_features(round_features[list(FEATURE_SCHEMA)], season, round_number)
+                stored_fingerprints[str(round_number)] = fingerprints.get(str(round_number))
+                written += 1
+        save_feature_fingerprints(season, stored_fingerprints)
+        with _lock:
+            _frames.pop(season, None)
+    return written
+
+def _season_frame(season) -> pd.DataFrame:
+    # Filled once, then served from memory; the running season is checked again after the refresh window
+    with _lock:
+        cached = _frames.get(season)
+    if cached is not None and datetime.now() - cached[0] < CURRENT_SEASON_REFRESH:
+        return cached[1]
+
+    fill_feature_store([season])
+    features = read_feature_rows([season])
+    if features.empty:
+        features = pd.DataFrame(columns=list(FEATURE_SCHEMA) + ['Season', 'Round'])
+    features = _typed(features.drop(columns=['Session'], errors='ignore'))
+    features = features.set_index(KEYS, drop=False).sort_index()
+    # An empty season (nothing ingested yet) is not cached, so the next call tries again
+    if not features.empty:
+        with _lock:
+            _frames[season] = (datetime.now(), features)
+    return features
+
+def read_features(seasons, rounds=None, drivers=None, columns=None) -> pd.DataFrame:
+    # Range lookup: every row of the seasons, optionally narrowed to a (first, last) round range or list and drivers
+    frames = [_season_frame(season) for season in seasons]
+    features = pd.concat(frames) if frames else pd.DataFrame(columns=list(FEATURE_SCHEMA))
+    if rounds is not None:
+        if isinstance(rounds, tuple):
+            features = features.loc[features['Round'].between(*rounds)]
+        else:
+            features = features.loc[features['Round'].isin(list(rounds))]
+    if drivers is not None:
+        features = features.loc[features['Driver'].isin(list(drivers))]
+    if columns is not None:
+        features = features[columns]
+    return features.reset_index(drop=True)
+
+def get_features(driver:str, season:int, round_number:int) -> dict:
+    # Point lookup on the in-memory index, None when the driver did not take part in that round
+    features = _season_frame(season)
+    key = (driver, season, round_number)
+    if key not in features.index:
+        return None
+    return features.loc[[key]].iloc[0].to_dict()
+
+def results_frame(starting_season:int, last_season:int) -> pd.DataFrame:
+    # The race rows in the layout compute_driver_profiles expects
+    features = read_features(range(starting_season, last_season + 1))
+    features = features.loc[features['RacePosition'].notna()]
+    return features.rename(columns={'Driver': 'FullName', 'RacePosition': 'Position', 'DNF': 'IsDNF'}).reset_index(drop=True)
+
+def season_synergies(drivers:list = None, season:int = 2025) -> dict:
+    # Same shape as get_synergy_metrics_for_drivers
+    totals = contributions_to_partials(read_features([season]))
+    return finalise_synergies(totals, list(totals.index) if drivers is None else drivers)
+
+def season_aggregates(season:int = 2025) -> pd.DataFrame:
+    # Same aggregates as season_synergies as a frame indexed by driver, with the team they raced most for
+    rows = read_features([season])
+    totals = contributions_to_partials(rows)
+    aggregates = pd.DataFrame({
+        'Teammate_delta': totals['total_lap_delta'] / totals['delta_calculated_races'].replace(0, np.nan),
+        'Lap_stdev': totals['total_deviation'] / totals['deviation_calculated_races'].replace(0, np.nan),
+        'Avg_Q': totals['quali_pos'] / totals['quali_count'].replace(0, np.nan),
+        'Avg_R': totals['race_sum'] / totals['race_count'].replace(0, np.nan),
+        'DNFRate': totals['dnf_count'] * 100 / totals['race_count'].replace(0, np.nan)
+    }).fillna(0)
+    teams = rows.dropna(subset=['TeamName']).groupby('Driver')['TeamName'].agg(lambda names: names.mode().iloc[0])
+    aggregates['TeamName'] = teams
+    aggregates.index.name = 'Driver'
+    return aggregates
+
+def team_aggregates(season:int = 2025) -> pd.DataFrame:
+    # Per-team means of the drivers' season aggregates, i.e. what the car delivered that season
+    aggregates = season_aggregates(season).dropna(subset=['TeamName'])
+    return aggregates.groupby('TeamName')[SYNERGY_METRICS].mean()
+
+def driver_season_metrics(driver:str, season:int = 2025) -> dict:
+    # Season aggregates plus the per-round series the Synergy Analysis page plots
+    rows = read_features([season], drivers=[driver]).sort_values('Round')
+    aggregates = finalise_synergies(contributions_to_partials(rows), [driver])[driver]
+    synergy_results = {metric: aggregates[metric] for metric in SYNERGY_METRICS}
+
+    quali = rows.dropna(subset=['QualiPosition'])
+    race = rows.dropna(subset=['RacePosition'])
+    with_teammate = race.loc[race['Teammate'].notna()]
+    synergy_results['Q_positions'] = dict(zip(quali['Round'].astype(int).tolist(), quali['QualiPosition'].astype(int).tolist()))
+    synergy_results['R_positions'] = dict(zip(race['Round'].astype(int).tolist(), race['RacePosition'].astype(int).tolist()))
+    synergy_results['RaceLapDeltas'] = dict(zip(with_teammate['Round'].astype(int).tolist(),
+                                                with_teammate['TeammateDelta'].fillna(0).astype(float).tolist()))
+    synergy_results['Color'] = race['TeamColor'].iloc[-1] if not race.empty else ''
+    return synergy_results
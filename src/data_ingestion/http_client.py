@@ -0,0 +1,106 @@
+# Shared HTTP client for the OpenF1 API: keep-alive connection pooling, timeouts,
+# retries with jittered exponential backoff and per-endpoint latency metrics
+import os
+import time
+import random
+import threading
+import requests
+
+from requests.adapters import HTTPAdapter
+from src.utils.scheduler import acquire
+
+# The base URL can be pointed at a local stand-in server (e.g. for testing)
+BASE_URL = os.environ.get('OPENF1_BASE_URL', 'https://api.openf1.org/v1/')
+
+CONNECT_TIMEOUT = 5     # seconds
+READ_TIMEOUT = 30       # seconds
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5      # seconds, doubled on every retry
+BACKOFF_MAX = 30        # seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+POOL_SIZE = 16          # kept-alive connections, matches the scheduler's thread pool with some headroom
+
+_session = None
+_session_lock = threading.Lock()
+_metrics = {}           # endpoint -> request counts and latencies
+_metrics_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            # Retries are handled in get(), so the adapter only pools connections
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=0)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+def configure(base_url:str = None, connect_timeout:float = None, read_timeout:float = None, max_retries:int = None):
+    global BASE_URL, CONNECT_TIMEOUT, READ_TIMEOUT, MAX_RETRIES, _session
+    if base_url is not None:
+        BASE_URL = base_url if base_url.endswith('/') else base_url + '/'
+    if connect_timeout is not None:
+        CONNECT_TIMEOUT = connect_timeout
+    if read_timeout is not None:
+        READ_TIMEOUT = read_timeout
+    if max_retries is not None:
+        MAX_RETRIES = max_retries
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def _backoff_delay(attempt:int, retry_after:str = None) -> float:
+    # Honour the server's Retry-After when it sends one, otherwise use full jitter on an exponential cap
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def _record(endpoint:str, elapsed:float, error:bool = False, retry:bool = False):
+    with _metrics_lock:
+        metrics = _metrics.setdefault(endpoint, {'requests': 0, 'errors': 0, 'retries': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+        metrics['requests'] += 1
+        metrics['errors'] += int(error)
+        metrics['retries'] += int(retry)
+        metrics['total_seconds'] += elapsed
+        metrics['max_seconds'] = max(metrics['max_seconds'], elapsed)
+
+def get(endpoint:str, params:dict = None, headers:dict = None) -> requests.Response:
+    session = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        acquire('openf1')
+        start = time.perf_counter()
+        try:
+            response = session.get(BASE_URL + endpoint, params=params, headers=headers,
+                                   timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        except (requests.ConnectionError, requests.Timeout):
+            _record(endpoint, time.perf_counter() - start, error=True, retry=attempt < MAX_RETRIES)
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            continue
+
+        retry = response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES
+        _record(endpoint, time.perf_counter() - start, error=response.status_code >= 400, retry=retry)
+        if not retry:
+            response.raise_for_status()
+            return response
+        time.sleep(_backoff_delay(attempt, response.headers.get('Retry-After')))
+
+def get_json(endpoint:str, params:dict = None):
+    return get(endpoint, params).json()
+
+def get_latency_metrics() -> dict:
+    with _metrics_lock:
+        return {
+            endpoint: {**metrics, 'mean_seconds': metrics['total_seconds'] / metrics['requests']}
+            for endpoint, metrics in _metrics.items()
+        }
+
+def reset_latency_metrics():
+    with _metrics_lock:
+        _metrics.clear()
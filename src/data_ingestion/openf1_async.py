@@ -0,0 +1,135 @@
+# Asyncio variant of the OpenF1 fan-out queries in openf1_loader. Requests run concurrently (bounded by a
+# semaphore and the shared OpenF1 token bucket) and return the same DataFrames / lists as the sync loaders.
+import time
+import asyncio
+import aiohttp
+import threading
+import pandas as pd
+
+from src.data_ingestion import http_client, response_cache
+from src.utils.scheduler import acquire_async
+
+MAX_CONCURRENCY = 8
+
+def _open_session() -> aiohttp.ClientSession:
+    timeout = aiohttp.ClientTimeout(sock_connect=http_client.CONNECT_TIMEOUT, sock_read=http_client.READ_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENCY)
+    return aiohttp.ClientSession(timeout=timeout, connector=connector)
+
+async def _get(http, semaphore, endpoint: str, params: dict = {}, headers: dict = None) -> tuple:
+    # Same timeouts, retry policy and latency metrics as the sync client; returns (status, body, ETag, Last-Modified)
+    params = {key: str(value) for key, value in params.items() if value is not None}
+    async with semaphore:
+        for attempt in range(http_client.MAX_RETRIES + 1):
+            await acquire_async('openf1')
+            start = time.perf_counter()
+            try:
+                async with http.get(http_client.BASE_URL + endpoint, params=params, headers=headers) as response:
+                    retry = response.status in http_client.RETRY_STATUSES and attempt < http_client.MAX_RETRIES
+                    http_client._record(endpoint, time.perf_counter() - start, error=response.status >= 400, retry=retry)
+                    if not retry:
+                        response.raise_for_status()
+                        body = None if response.status == 304 else await response.json()
+                        return response.status, body, response.headers.get('ETag'), response.headers.get('Last-Modified')
+                    delay = http_client._backoff_delay(attempt, response.headers.get('Retry-After'))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                http_client._record(endpoint, time.perf_counter() - start, error=True, retry=attempt < http_client.MAX_RETRIES)
+                if attempt == http_client.MAX_RETRIES:
+                    raise
+                delay = http_client._backoff_delay(attempt)
+            await asyncio.sleep(delay)
+
+async def _get_json(http, semaphore, endpoint: str, params: dict = {}):
+    _, body, _, _ = await _get(http, semaphore, endpoint, params)
+    return body
+
+async def _fetch_static_data(http, semaphore, endpoint: str, params: dict = {}) -> pd.DataFrame:
+    # Same cache policy as response_cache.get_json: revalidate expired entries, serve them stale on errors
+    if endpoint not in response_cache.CACHED_ENDPOINTS:
+        return pd.DataFrame(await _get_json(http, semaphore, endpoint, params))
+
+    data, entry, headers = response_cache.begin_fetch(endpoint, params)
+    if data is None:
+        try:
+            status, body, etag, last_modified = await _get(http, semaphore, endpoint, params, headers)
+        except Exception as e:
+            data = response_cache.serve_stale(endpoint, entry, e)
+        else:
+            data = response_cache.finish_fetch(endpoint, params, entry, status, body, etag, last_modified)
+    return pd.DataFrame(data)
+
+async def _get_sessions_list(http, semaphore, session_name=None, year=None) -> list:
+    sessions = await _fetch_static_data(http, semaphore, 'sessions', {'session_name': session_name, 'year': year})
+    if sessions.empty:
+        return []
+    return sessions['session_key'].to_list()
+
+async def _race_driver_names(http, semaphore, session_key) -> list:
+    race_drivers = await _fetch_static_data(http, semaphore, 'drivers', {'session_key': session_key})
+    race_drivers = race_drivers.drop_duplicates(subset='full_name')
+    return (race_drivers['first_name'] + ' ' + race_drivers['last_name']).to_list()
+
+async def _drivers_for_races(http, semaphore, race_keys) -> set:
+    # Every race's drivers call is issued at once; failed calls are reported and skipped
+    distinct_drivers = set()
+    races_drivers = await asyncio.gather(*[_race_driver_names(http, semaphore, race) for race in race_keys],
+                                         return_exceptions=True)
+    for race, race_drivers_list in zip(race_keys, races_drivers):
+        if isinstance(race_drivers_list, Exception):
+            print(f'Error getting drivers for session {race}: {race_drivers_list}')
+            continue
+        distinct_drivers.update(race_drivers_list)
+    return distinct_drivers
+
+async def get_recent_drivers_async(start_year:int = 2023, end_year:int = 2025) -> set:
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with _open_session() as http:
+        years = range(start_year, end_year+1)
+        year_races = await asyncio.gather(*[_get_sessions_list(http, semaphore, 'Race', year) for year in years])
+        race_keys = [race for races in year_races for race in races]
+        return await _drivers_for_races(http, semaphore, race_keys)
+
+async def get_drivers_for_season_async(season:int = 2025) -> list:
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with _open_session() as http:
+        races = await _get_sessions_list(http, semaphore, 'Race', season)
+        return list(await _drivers_for_races(http, semaphore, races))
+
+async def get_laps_count_async() -> int:
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    async with _open_session() as http:
+        sessions_list = await _get_sessions_list(http, semaphore)
+        sessions_laps = await asyncio.gather(*[_get_json(http, semaphore, 'laps', {'session_key': session_key})
+                                               for session_key in sessions_list])
+        return sum(len(session_laps) for session_laps in sessions_laps)
+
+### Sync wrappers (for Streamlit pages)
+
+def run(coroutine):
+    # Streamlit runs pages in a thread without an event loop, but notebooks already have one running
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    result = {}
+    def runner():
+        try:
+            result['value'] = asyncio.run(coroutine)
+        except Exception as e:
+            result['error'] = e
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+def get_recent_drivers(start_year:int = 2023, end_year:int = 2025) -> set:
+    return run(get_recent_drivers_async(start_year, end_year))
+
+def get_drivers_for_season(season:int = 2025) -> list:
+    return run(get_drivers_for_season_async(season))
+
+def get_laps_count() -> int:
+    return run(get_laps_count_async())
@@ -1,33 +1,99 @@
 # Responsible for loading data from the OpenF1 API
 
-import requests
 import pandas as pd
-import time
-
-BASE_URL = 'https://api.openf1.org/v1/'
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import timedelta
+
+from src.data_ingestion import http_client, response_cache
+from src.utils.scheduler import run_parallel
+
+# Time series endpoints are paged by date window, each window is one request and one DataFrame chunk
+CHUNK_WINDOW = timedelta(minutes=5)
+SESSION_PADDING = timedelta(minutes=30) # data recorded just before the start and after the end of a session
+
+# Compact (nullable) dtypes for the time series endpoints, so chunks keep the same schema
+TIME_SERIES_DTYPES = {
+    'car_data': {
+        'meeting_key': 'Int32',
+        'session_key': 'Int32',
+        'driver_number': 'Int8',
+        'speed': 'Int16',
+        'throttle': 'Int16',
+        'brake': 'Int16',
+        'drs': 'Int8',
+        'n_gear': 'Int8',
+        'rpm': 'Int32'
+    },
+    'location': {
+        'meeting_key': 'Int32',
+        'session_key': 'Int32',
+        'driver_number': 'Int8',
+        'x': 'Int32',
+        'y': 'Int32',
+        'z': 'Int32'
+    }
+}
+
+def _typed_chunk(endpoint: str, data: list) -> pd.DataFrame:
+    chunk = pd.DataFrame(data)
+    chunk['date'] = pd.to_datetime(chunk['date'], utc=True, format='ISO8601')
+    dtypes = {column: dtype for column, dtype in TIME_SERIES_DTYPES.get(endpoint, {}).items() if column in chunk.columns}
+    return chunk.astype(dtypes)
+
+def _session_window(session_key):
+    session = fetch_static_data('sessions', {'session_key': session_key})
+    date_start = pd.to_datetime(session['date_start'].iloc[0], utc=True)
+    date_end = pd.to_datetime(session['date_end'].iloc[0], utc=True)
+    return date_start - SESSION_PADDING, date_end + SESSION_PADDING
+
+def iter_openf1_data(endpoint: str, params: dict = {}, window: timedelta = CHUNK_WINDOW):
+    # Generator over a session's time series, yielding one typed DataFrame per date window.
+    # Only the current window is held in memory, instead of every JSON record of the session.
+    window_start, session_end = _session_window(params['session_key'])
+
+    while window_start < session_end:
+        window_end = window_start + window
+        # Half-open windows [start, end): a sample exactly on a boundary is fetched by the window it starts
+        window_params = {**params, 'date>=': window_start.isoformat(), 'date<': window_end.isoformat()}
+        data = http_client.get_json(endpoint, window_params)
+        if data:
+            chunk = _typed_chunk(endpoint, data)
+            # Same half-open window on our side, in case the API's bounds are looser than requested
+            chunk = chunk.loc[(chunk['date'] >= window_start) & (chunk['date'] < window_end)]
+            if not chunk.empty:
+                yield chunk.reset_index(drop=True)
+        window_start = window_end
 
 def fetch_openf1_data(endpoint: str, params: dict = {}) -> pd.DataFrame:
-    all_data = []
-    limit = 10000
-    offset = 0
-
-    while True:
-        response = requests.get(BASE_URL + endpoint, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if not data: 
-            break
-
-        all_data.extend(data)
-        offset += limit
-
-    return pd.DataFrame(all_data)
+    if params.get('session_key') is None:
+        # Without a session there is no date range to page over
+        return fetch_static_data(endpoint, params)
+
+    chunks = list(iter_openf1_data(endpoint, params))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+def write_openf1_parquet(endpoint: str, params: dict, path: str, window: timedelta = CHUNK_WINDOW) -> int:
+    # Streams the chunks straight into one Parquet file (one row group per window) and returns the rows written
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_openf1_data(endpoint, params, window):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
 
 def fetch_static_data(endpoint: str, params: dict = {}) -> pd.DataFrame:
-    data = []
-    response = requests.get(BASE_URL + endpoint, params=params)
-    response.raise_for_status()
-    data = response.json()
+    # sessions, drivers and meetings are served from the on-disk response cache when possible
+    data = response_cache.get_json(endpoint, params)
     return pd.DataFrame(data)
 
 ### Sessions calls
@@ -142,33 +208,31 @@ def get_driver_image(full_name: str = None) -> str:
     result = fetch_static_data('drivers', params)
     return result.iloc[10]['headshot_url']
 
-def get_recent_drivers(start_year:int = 2023, end_year:int = 2025):
+def _race_driver_names(session_key) -> list:
+    race_drivers = get_distinct_drivers(session_key=session_key)
+    print(f'Got drivers for session {session_key}')
+    return (race_drivers['first_name'] + ' ' + race_drivers['last_name']).to_list()
 
+def _drivers_for_races(race_keys) -> set:
+    # One drivers call per race, fanned out over the shared scheduler (the HTTP client applies the OpenF1 rate limit)
     distinct_drivers = set()
-
-    for each_year in range(start_year, end_year+1):
-        year_races = get_sessions_list(session_name='Race', year=each_year)
-        print(f'Got sessions for {each_year}')
-        for each_race in year_races:
-            race_drivers = get_distinct_drivers(session_key=each_race)
-            print(f'Got drivers for session {each_race}')
-            time.sleep(1)
-            race_drivers['FullName'] = race_drivers['first_name'] + ' ' + race_drivers['last_name']
-            race_drivers_list = race_drivers['FullName'].to_list()
-            for driver in race_drivers_list: distinct_drivers.add(driver)
+    for race_drivers_list in run_parallel(_race_driver_names, race_keys):
+        if race_drivers_list is not None:
+            distinct_drivers.update(race_drivers_list)
     return distinct_drivers
 
+def get_recent_drivers(start_year:int = 2023, end_year:int = 2025):
+
+    years = list(range(start_year, end_year+1))
+    year_races = run_parallel(lambda year: get_sessions_list(session_name='Race', year=year), years)
+    race_keys = [race for races in year_races if races is not None for race in races]
+    print(f'Got sessions for {start_year}-{end_year}')
+    return _drivers_for_races(race_keys)
+
 def get_drivers_for_season(season:int = 2025):
-    drivers_per_season = set()
     races = get_sessions_list(session_name='Race', year=season)
-    for each_race in races:
-        race_drivers = get_distinct_drivers(session_key=each_race)
-        time.sleep(1)
-        race_drivers['FullName'] = race_drivers['first_name'] + ' ' + race_drivers['last_name']
-        race_drivers_list = race_drivers['FullName'].to_list()
-        for driver in race_drivers_list: drivers_per_season.add(driver)
-
-    return list(drivers_per_season)
+    return list(_drivers_for_races(races))
+
 ### Laps calls
 
 def get_laps(driver_number=None, lap_number=None, meeting_key=None, session_key=None):
@@ -194,6 +258,14 @@ def get_car_data(session_key=None, driver_number=None):
     params = {"session_key": session_key, "driver_number": driver_number}
     return fetch_openf1_data("car_data", params)
 
+def iter_car_data(session_key=None, driver_number=None, window: timedelta = CHUNK_WINDOW):
+    params = {"session_key": session_key, "driver_number": driver_number}
+    return iter_openf1_data("car_data", params, window)
+
+def save_car_data(path: str, session_key=None, driver_number=None) -> int:
+    params = {"session_key": session_key, "driver_number": driver_number}
+    return write_openf1_parquet("car_data", params, path)
+
 def get_teams_for_driver(driver_name=None):
     params = {'full_name': driver_name}
 
@@ -0,0 +1,182 @@
+# On-disk cache of OpenF1 responses for the (mostly) static endpoints, keyed by endpoint and params.
+# Data about sessions that finished a while ago never changes, so it is kept forever; anything more
+# recent expires after a short TTL and is then revalidated with the server when it supports it.
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import pandas as pd
+from datetime import timedelta
+from collections import OrderedDict
+
+from src.data_ingestion import http_client
+
+CACHE_DIR = os.path.join('data', 'http_cache')
+SESSION_ENDS_PATH = os.path.join(CACHE_DIR, 'session_ends.json')
+CACHED_ENDPOINTS = {'sessions', 'drivers', 'meetings'}
+RECENT_TTL = timedelta(minutes=10)
+SETTLED_AFTER = timedelta(hours=6)  # a session's data is considered final this long after it ended
+MAX_MEMORY_ENTRIES = 512            # entries kept in memory, the rest are read back from disk when needed
+
+_memory = OrderedDict() # key -> entry, so Streamlit reruns do not even read the disk, least recently used first
+_session_ends = None    # session_key -> date_end, learnt from every sessions response
+_lock = threading.Lock()
+
+def _key(endpoint: str, params: dict) -> str:
+    params = sorted((key, str(value)) for key, value in (params or {}).items() if value is not None)
+    return hashlib.sha1(json.dumps([endpoint, params]).encode('utf-8')).hexdigest()
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f'{key}.json')
+
+def _write_json(path: str, content):
+    # Written to a temporary file of its own first, so a crash or another process writing the same entry
+    # never leaves a half-written or mixed entry behind
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), suffix='.tmp', delete=False) as cache_file:
+        temp_path = cache_file.name
+        try:
+            json.dump(content, cache_file)
+        except Exception:
+            cache_file.close()
+            os.remove(temp_path)
+            raise
+    os.replace(temp_path, path)
+
+def _read_entry(key: str):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    path = _path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as cache_file:
+            entry = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    _remember(key, entry)
+    return entry
+
+def _remember(key: str, entry: dict):
+    with _lock:
+        _memory[key] = entry
+        _memory.move_to_end(key)
+        while len(_memory) > MAX_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+def _load_session_ends() -> dict:
+    global _session_ends
+    if _session_ends is None:
+        _session_ends = {}
+        if os.path.exists(SESSION_ENDS_PATH):
+            with open(SESSION_ENDS_PATH) as ends_file:
+                _session_ends = json.load(ends_file)
+    return _session_ends
+
+def _remember_session_ends(data: list):
+    with _lock:
+        session_ends = _load_session_ends()
+        new_ends = {str(row['session_key']): row['date_end'] for row in data
+                    if row.get('session_key') is not None and row.get('date_end')}
+        if any(session_ends.get(key) != end for key, end in new_ends.items()):
+            session_ends.update(new_ends)
+            _write_json(SESSION_ENDS_PATH, session_ends)
+
+def _ended_long_ago(date_end) -> bool:
+    return pd.Timestamp.now(tz='UTC') - pd.to_datetime(date_end, utc=True) > SETTLED_AFTER
+
+def _is_settled(endpoint: str, params: dict, data: list) -> bool:
+    year = params.get('year')
+    if year is not None and int(year) < pd.Timestamp.now(tz='UTC').year:
+        return True
+
+    if endpoint == 'sessions' and data:
+        return all(row.get('date_end') and _ended_long_ago(row['date_end']) for row in data)
+
+    # Per-session data is final once that session ended; unknown sessions are treated as recent
+    session_key = params.get('session_key')
+    if session_key is not None and str(session_key) != 'latest':
+        with _lock:
+            date_end = _load_session_ends().get(str(session_key))
+        return date_end is not None and _ended_long_ago(date_end)
+
+    return False
+
+def lookup(endpoint: str, params: dict = {}):
+    # Fresh cached data, or None when the request has to go to the network
+    entry = _read_entry(_key(endpoint, params))
+    if entry is None:
+        return None
+    if entry['expires_at'] is not None and entry['expires_at'] <= time.time():
+        return None
+    return entry['data']
+
+def store(endpoint: str, params: dict, data, etag: str = None, last_modified: str = None):
+    if endpoint == 'sessions':
+        _remember_session_ends(data)
+    now = time.time()
+    entry = {
+        'endpoint': endpoint,
+        'params': {key: str(value) for key, value in (params or {}).items() if value is not None},
+        'data': data,
+        'fetched_at': now,
+        'expires_at': None if _is_settled(endpoint, params or {}, data) else now + RECENT_TTL.total_seconds(),
+        'etag': etag,
+        'last_modified': last_modified
+    }
+    key = _key(endpoint, params)
+    _write_json(_path(key), entry)
+    _remember(key, entry)
+
+def begin_fetch(endpoint: str, params: dict = {}) -> tuple:
+    # (fresh cached data, None, None) when no request is needed, otherwise (None, the expired entry or None,
+    # the conditional headers to revalidate it with). Shared by the sync and async clients
+    data = lookup(endpoint, params)
+    if data is not None:
+        return data, None, None
+
+    entry = _read_entry(_key(endpoint, params))
+    headers = {}
+    if entry is not None and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry is not None and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return None, entry, headers or None
+
+def finish_fetch(endpoint: str, params: dict, entry, status: int, body, etag: str = None, last_modified: str = None):
+    # A 304 keeps the cached data; either way the entry gets a new expiry and the server's validators
+    data = entry['data'] if status == 304 else body
+    store(endpoint, params, data, etag, last_modified)
+    return data
+
+def serve_stale(endpoint: str, entry, error: Exception):
+    # The request failed: the expired copy is served when there is one
+    if entry is None:
+        raise error
+    print(f'Serving stale {endpoint} data: {error}')
+    return entry['data']
+
+def get_json(endpoint: str, params: dict = {}):
+    if endpoint not in CACHED_ENDPOINTS:
+        return http_client.get_json(endpoint, params)
+
+    data, entry, headers = begin_fetch(endpoint, params)
+    if data is not None:
+        return data
+
+    try:
+        response = http_client.get(endpoint, params, headers=headers)
+    except Exception as e:
+        return serve_stale(endpoint, entry, e)
+
+    body = None if response.status_code == 304 else response.json()
+    return finish_fetch(endpoint, params, entry, response.status_code, body,
+                        response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+def clear_response_cache():
+    with _lock:
+        _memory.clear()
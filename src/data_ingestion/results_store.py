@@ -0,0 +1,291 @@
+# Columnar warehouse of the results and cleaned laps of every session of every event (practice, sprint,
+# qualifying and race), stored as Parquet partitioned by season/round/session, so loaders can answer
+# multi-season questions with a single read
+import os
+import sys
+import json
+import shutil
+import fastf1
+import pandas as pd
+from datetime import datetime, timedelta
+
+from src.data_ingestion.session_cache import load_with_profile
+from src.utils.scheduler import acquire, run_parallel
+
+STORE_PATH = os.path.join('data', 'warehouse')
+MANIFEST_PATH = os.path.join(STORE_PATH, 'manifest.json')
+FEATURES_MANIFEST_PATH = os.path.join(STORE_PATH, 'features_manifest.json')
+FIRST_SEASON = 2018
+SESSIONS = ['Q', 'R']      # every event must have these stored, they are what the loaders read
+# Schedule session names -> the identifiers used by fastf1.get_session and the Session partitions
+SESSION_IDENTIFIERS = {
+    'Practice 1': 'FP1',
+    'Practice 2': 'FP2',
+    'Practice 3': 'FP3',
+    'Sprint Shootout': 'SS',
+    'Sprint Qualifying': 'SQ',
+    'Sprint': 'S',
+    'Qualifying': 'Q',
+    'Race': 'R'
+}
+CURRENT_SEASON_REFRESH = timedelta(hours=6) # how long the current season is trusted before checking for new rounds
+
+RESULTS_COLUMNS = ['DriverNumber', 'Abbreviation', 'FullName', 'TeamName', 'TeamId', 'TeamColor',
+                   'Position', 'GridPosition', 'Q1', 'Q2', 'Q3', 'Status', 'Points']
+LAPS_COLUMNS = ['Driver', 'DriverNumber', 'Team', 'LapNumber', 'Stint', 'Compound', 'TyreLife',
+                'LapTimeSeconds', 'IsAccurate', 'IsClean']
+
+# Column -> dtype of every dataset, so a column that is all null in one partition (e.g. a session without
+# TeamColor or Compound) is still written with the type the other partitions have, and the dataset stays readable
+DATASET_DTYPES = {
+    'results': {
+        'DriverNumber': 'string', 'Abbreviation': 'string', 'FullName': 'string', 'TeamName': 'string',
+        'TeamId': 'string', 'TeamColor': 'string', 'Position': 'float64', 'GridPosition': 'float64',
+        'Q1': 'timedelta64[ns]', 'Q2': 'timedelta64[ns]', 'Q3': 'timedelta64[ns]', 'Status': 'string',
+        'Points': 'float64', 'EventName': 'string'
+    },
+    'laps': {
+        'Driver': 'string', 'DriverNumber': 'string', 'Team': 'string', 'LapNumber': 'float64', 'Stint': 'float64',
+        'Compound': 'string', 'TyreLife': 'float64', 'LapTimeSeconds': 'float64', 'IsAccurate': 'bool', 'IsClean': 'bool'
+    },
+    'synergy_timeline': {
+        'Driver': 'string', 'Abbreviation': 'string', 'TeamName': 'string', 'TeamColor': 'string', 'Teammate': 'string',
+        'EventName': 'string', 'Teammate_delta': 'float64', 'Lap_stdev': 'float64', 'Avg_Q': 'float64',
+        'Avg_R': 'float64', 'DNFRate': 'float64', 'Synergy': 'float64'
+    }
+}
+
+def _partition_path(dataset, season, round_number, session_type):
+    return os.path.join(STORE_PATH, dataset, f'Season={season}', f'Round={round_number}', f'Session={session_type}')
+
+def _typed(df, dataset) -> pd.DataFrame:
+    df = df.copy()
+    for column, dtype in DATASET_DTYPES.get(dataset, {}).items():
+        if column in df.columns:
+            if dtype == 'bool':
+                df[column] = df[column].fillna(False)
+            df[column] = df[column].astype(dtype)
+    return df
+
+def _write_partition(df, dataset, season, round_number, session_type):
+    # Each (season, round, session) owns its partition directory, so re-ingesting replaces instead of duplicating
+    path = _partition_path(dataset, season, round_number, session_type)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    df = _typed(df, dataset)
+    df.to_parquet(os.path.join(path, 'part-0.parquet'), index=False)
+
+def clean_laps(laps) -> pd.DataFrame:
+    laps = pd.DataFrame(laps)
+    laps['LapTimeSeconds'] = laps['LapTime'].dt.total_seconds()
+    # Valid laps only (not in lap, out lap, and laptimes must be accurate)
+    laps['IsClean'] = (
+        laps['PitInTime'].isnull() &
+        laps['PitOutTime'].isnull() &
+        laps['IsAccurate'].fillna(False).astype(bool) &
+        laps['LapTime'].notnull()
+    )
+    return laps[[column for column in LAPS_COLUMNS if column in laps.columns]]
+
+def ingest_session(season, round_number, session_type, event_name=None):
+    session = load_with_profile(fastf1.get_session(season, round_number, session_type), 'laps-no-telemetry')
+
+    results = pd.DataFrame(session.results)[RESULTS_COLUMNS]
+    results['EventName'] = event_name if event_name is not None else session.event['EventName']
+    _write_partition(results, 'results', season, round_number, session_type)
+
+    try:
+        _write_partition(clean_laps(session.laps), 'laps', season, round_number, session_type)
+    except Exception as e:
+        # Older seasons may have results but no timing data
+        print(f'No laps stored for {season} round {round_number} {session_type}: {e}')
+
+def _load_manifest() -> dict:
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH) as manifest_file:
+        return json.load(manifest_file)
+
+def _save_manifest(manifest):
+    os.makedirs(STORE_PATH, exist_ok=True)
+    with open(MANIFEST_PATH, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+def stored_rounds(season) -> list:
+    return _load_manifest().get(str(season), {}).get('rounds', [])
+
+_scheduled = {}     # season -> number of scheduled events, from the last schedule fetched by pending_events
+
+def event_sessions(season, round_number) -> list:
+    # Identifiers of every session on the event's schedule, in running order
+    acquire('fastf1')
+    event = fastf1.get_event(season, round_number)
+    names = [event.get(f'Session{number}') for number in range(1, 6)]
+    sessions = [SESSION_IDENTIFIERS[name] for name in names if name in SESSION_IDENTIFIERS]
+    return sessions + [session_type for session_type in SESSIONS if session_type not in sessions]
+
+def ingest_event(season, round_number, event_name):
+    for session_type in event_sessions(season, round_number):
+        acquire('fastf1')
+        try:
+            ingest_session(season, round_number, session_type, event_name)
+        except Exception as e:
+            # Practice and sprint sessions are stored when available, the event fails only without Q or R
+            if session_type in SESSIONS:
+                raise
+            print(f'No {session_type} stored for {season} round {round_number}: {e}')
+    print(f'Stored {event_name} - {season}')
+    return round_number
+
+def pending_events(seasons, overwrite=False) -> list:
+    # (season, round, event name) of every completed event not stored yet. Seasons with nothing pending are
+    # recorded as checked right away, the others once record_rounds is given what was stored
+    manifest = _load_manifest()
+    tasks = []
+    checked = []
+    for season in seasons:
+        done = set() if overwrite else set(manifest.get(str(season), {'rounds': []})['rounds'])
+        try:
+            acquire('fastf1')
+            schedule = fastf1.get_event_schedule(season, include_testing=False)
+        except Exception as e:
+            print(f'Failed to get schedule for year {season}: {e}')
+            continue
+
+        _scheduled[season] = len(schedule)
+        completed = schedule.loc[schedule['EventDate'] < datetime.today()]
+        season_tasks = [(season, int(event['RoundNumber']), event['EventName']) for _, event in completed.iterrows()
+                        if int(event['RoundNumber']) not in done]
+        if season_tasks:
+            tasks.extend(season_tasks)
+        else:
+            checked.append(season)
+
+    if checked:
+        record_rounds(checked, [], overwrite)
+    return tasks
+
+def record_rounds(seasons, stored:list, overwrite=False):
+    # Adds the newly stored (season, round) pairs to the manifest and refreshes the seasons' completeness
+    manifest = _load_manifest()
+    for season in seasons:
+        if season not in _scheduled:
+            continue
+        done = set() if overwrite else set(manifest.get(str(season), {'rounds': []})['rounds'])
+        done |= {round_number for stored_season, round_number in stored if stored_season == season}
+        manifest[str(season)] = {
+            'rounds': sorted(done),
+            'complete': len(done) >= _scheduled[season],
+            'updated': datetime.today().isoformat()
+        }
+    _save_manifest(manifest)
+
+def ingest(seasons, overwrite=False):
+    # The missing events of every requested season are fanned out together over the shared scheduler
+    tasks = pending_events(seasons, overwrite)
+    stored = run_parallel(ingest_event, tasks)
+    ingested = [(season, round_number) for (season, _, _), round_number in zip(tasks, stored) if round_number is not None]
+    record_rounds(sorted({season for season, _, _ in tasks}), ingested, overwrite)
+
+def ingest_season(season, overwrite=False):
+    ingest([season], overwrite)
+
+def ingest_seasons(first_season:int = FIRST_SEASON, last_season:int = None, overwrite=False):
+    last_season = last_season or datetime.today().year
+    ingest(range(first_season, last_season + 1), overwrite)
+
+def stale_seasons(seasons) -> list:
+    # Seasons that are missing, or the running season once its refresh window has passed
+    manifest = _load_manifest()
+    stale = []
+    for season in seasons:
+        entry = manifest.get(str(season))
+        if entry is not None and entry['complete']:
+            continue
+        if entry is not None and datetime.today() - datetime.fromisoformat(entry['updated']) < CURRENT_SEASON_REFRESH:
+            continue
+        if season > datetime.today().year:
+            continue
+        stale.append(season)
+    return stale
+
+def ensure_seasons(seasons):
+    # Only stale seasons hit fastf1
+    stale = stale_seasons(seasons)
+    if stale:
+        ingest(stale)
+
+def _read(dataset, seasons=None, session_type=None, rounds=None, columns=None) -> pd.DataFrame:
+    path = os.path.join(STORE_PATH, dataset)
+    if not os.path.isdir(path):
+        return pd.DataFrame()
+
+    filters = []
+    if seasons is not None:
+        filters.append(('Season', 'in', list(seasons)))
+    if session_type is not None:
+        filters.append(('Session', '=', session_type))
+    if rounds is not None:
+        filters.append(('Round', 'in', list(rounds)))
+
+    df = pd.read_parquet(path, columns=columns, filters=filters or None)
+    # Partition keys come back as categoricals, plain types are easier to filter and merge on
+    for column, dtype in [('Season', int), ('Round', int), ('Session', str)]:
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    return df
+
+def read_results(seasons=None, session_type=None, rounds=None, columns=None) -> pd.DataFrame:
+    return _read('results', seasons, session_type, rounds, columns)
+
+def read_laps(seasons=None, session_type=None, rounds=None, columns=None) -> pd.DataFrame:
+    return _read('laps', seasons, session_type, rounds, columns)
+
+def _dataset_rounds(dataset, season) -> list:
+    path = os.path.join(STORE_PATH, dataset, f'Season={season}')
+    if not os.path.isdir(path):
+        return []
+    return sorted(int(name.split('=')[1]) for name in os.listdir(path) if name.startswith('Round='))
+
+# Per-race synergy stats of every driver, built by synergy_timeline from the results and laps above
+def write_synergy_timeline(df, season, round_number):
+    _write_partition(df, 'synergy_timeline', season, round_number, 'R')
+
+def synergy_timeline_rounds(season) -> list:
+    return _dataset_rounds('synergy_timeline', season)
+
+def read_synergy_timeline(seasons=None, rounds=None, columns=None) -> pd.DataFrame:
+    return _read('synergy_timeline', seasons, 'R', rounds, columns)
+
+# Per-(driver, season, round) features, filled by feature_store
+def write_features(df, season, round_number):
+    _write_partition(df, 'features', season, round_number, 'R')
+
+def feature_rounds(season) -> list:
+    return _dataset_rounds('features', season)
+
+def read_feature_rows(seasons=None, rounds=None, columns=None) -> pd.DataFrame:
+    return _read('features', seasons, 'R', rounds, columns)
+
+def feature_fingerprints(season) -> dict:
+    # Round -> fingerprint of the ledger rows the round's features were built from
+    if not os.path.exists(FEATURES_MANIFEST_PATH):
+        return {}
+    with open(FEATURES_MANIFEST_PATH) as manifest_file:
+        return json.load(manifest_file).get(str(season), {})
+
+def save_feature_fingerprints(season, fingerprints:dict):
+    manifest = {}
+    if os.path.exists(FEATURES_MANIFEST_PATH):
+        with open(FEATURES_MANIFEST_PATH) as manifest_file:
+            manifest = json.load(manifest_file)
+    manifest[str(season)] = fingerprints
+    os.makedirs(STORE_PATH, exist_ok=True)
+    with open(FEATURES_MANIFEST_PATH, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+if __name__ == '__main__':
+    # python -m src.data_ingestion.results_store [first_season] [last_season]
+    args = [int(arg) for arg in sys.argv[1:]]
+    ingest_seasons(*args)
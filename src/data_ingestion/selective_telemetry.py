@@ -0,0 +1,103 @@
+# Selective car data loading. fastf1 can only load the car data of every driver for the whole session, so the
+# raw CarData stream is fetched once (through fastf1's request cache) and only the records that fall inside the
+# requested lap windows are decoded, and only the requested drivers are kept from them.
+import time
+import numpy as np
+import pandas as pd
+from fastf1 import api
+from fastf1.req import Cache
+
+CAR_DATA_CHANNELS = {'0': 'RPM', '2': 'Speed', '3': 'nGear', '4': 'Throttle', '5': 'Brake'}
+TIMESTAMP_LENGTH = 12       # 'HH:MM:SS.mmm' at the start of every stream record
+WINDOW_PADDING = 2.0        # seconds decoded either side of a lap, records are timestamped in batches
+
+def _stream_seconds(timestamp:str) -> float:
+    hours, minutes, seconds = timestamp.split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def fetch_car_data_records(api_path:str) -> list:
+    # Raw (timestamp seconds, undecoded payload) records of the session's CarData stream
+    response = Cache.requests_get(api.base_url + api_path + api.pages['car_data'], headers=api.headers)
+    response.raise_for_status()
+    records = response.content.decode('utf-8-sig').split('\r\n')[:-1]
+    return [(_stream_seconds(record[:TIMESTAMP_LENGTH]), record[TIMESTAMP_LENGTH:]) for record in records]
+
+def decode_windows(records:list, windows:pd.DataFrame) -> tuple:
+    # windows: DriverNumber, StartSeconds, EndSeconds in session time. Returns {driver number: samples} and a report
+    start = time.perf_counter()
+    record_times = np.array([record_time for record_time, _ in records])
+    padded_start = windows['StartSeconds'].to_numpy() - WINDOW_PADDING
+    padded_end = windows['EndSeconds'].to_numpy() + WINDOW_PADDING
+    selected = ((record_times[:, np.newaxis] >= padded_start) & (record_times[:, np.newaxis] <= padded_end)).any(axis=1)
+    wanted = set(windows['DriverNumber'].astype(str))
+
+    samples = {driver_number: {'Utc': [], **{name: [] for name in CAR_DATA_CHANNELS.values()}}
+               for driver_number in wanted}
+    offsets = []
+    for record_index in np.flatnonzero(selected):
+        record_time, payload = records[record_index]
+        entries = api.parse(payload, zipped=True)['Entries']
+        for entry in entries:
+            utc = pd.Timestamp(entry['Utc']).timestamp()
+            for driver_number in wanted & entry['Cars'].keys():
+                channels = entry['Cars'][driver_number]['Channels']
+                driver_samples = samples[driver_number]
+                driver_samples['Utc'].append(utc)
+                for channel, name in CAR_DATA_CHANNELS.items():
+                    driver_samples[name].append(channels.get(channel, 0))
+        if entries:
+            # A record is sent right after its last entry, which ties the stream clock to UTC
+            offsets.append(record_time - pd.Timestamp(entries[-1]['Utc']).timestamp())
+
+    # UTC sample times mapped onto the session clock the lap timings use
+    offset = float(np.median(offsets)) if offsets else 0.0
+    car_data = {}
+    for driver_number, driver_samples in samples.items():
+        frame = pd.DataFrame(driver_samples).sort_values('Utc')
+        frame['SessionSeconds'] = frame.pop('Utc') + offset
+        car_data[driver_number] = frame.reset_index(drop=True)
+
+    decoded_bytes = sum(len(records[record_index][1]) for record_index in np.flatnonzero(selected))
+    total_bytes = sum(len(payload) for _, payload in records)
+    decode_seconds = time.perf_counter() - start
+    report = {
+        'records_total': len(records),
+        'records_decoded': int(selected.sum()),
+        'bytes_total': total_bytes,
+        'bytes_decoded': decoded_bytes,
+        'bytes_saved': total_bytes - decoded_bytes,
+        'decode_seconds': decode_seconds,
+        # Decoding dominates a car data load, so the full cost scales with the bytes a full load decodes
+        'estimated_full_decode_seconds': decode_seconds * total_bytes / decoded_bytes if decoded_bytes else 0.0
+    }
+    report['estimated_seconds_saved'] = report['estimated_full_decode_seconds'] - decode_seconds
+    return car_data, report
+
+def lap_car_data(driver_samples:pd.DataFrame, start_seconds:float, end_seconds:float) -> pd.DataFrame:
+    # One lap's samples in the layout of Lap.get_car_data().add_distance()
+    lap = driver_samples.loc[driver_samples['SessionSeconds'].between(start_seconds, end_seconds)].copy()
+    if lap.empty:
+        raise ValueError(f'No car data between {start_seconds:.1f}s and {end_seconds:.1f}s')
+    elapsed = lap.pop('SessionSeconds').to_numpy() - start_seconds
+    lap['Time'] = pd.to_timedelta(elapsed, unit='s')
+    lap['Brake'] = lap['Brake'].astype(bool)
+    # Distance integrated from speed, as fastf1's add_distance does
+    lap['Distance'] = np.cumsum(lap['Speed'].to_numpy() / 3.6 * np.diff(elapsed, prepend=elapsed[:1]))
+    return lap.reset_index(drop=True)
+
+def load_lap_car_data(session, laps:pd.DataFrame) -> tuple:
+    # laps: timing rows (DriverNumber, LapStartSeconds, LapEndSeconds). Returns one car data frame per row and the report
+    start = time.perf_counter()
+    records = fetch_car_data_records(session.api_path)
+    fetch_seconds = time.perf_counter() - start
+
+    windows = pd.DataFrame({
+        'DriverNumber': laps['DriverNumber'].astype(str),
+        'StartSeconds': laps['LapStartSeconds'],
+        'EndSeconds': laps['LapEndSeconds']
+    })
+    samples, report = decode_windows(records, windows)
+    report['fetch_seconds'] = fetch_seconds
+    laps_car_data = [lap_car_data(samples[driver_number], start_seconds, end_seconds)
+                     for driver_number, start_seconds, end_seconds in windows.itertuples(index=False)]
+    return laps_car_data, report
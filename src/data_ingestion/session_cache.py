@@ -0,0 +1,138 @@
+# Process-wide LRU cache of loaded FastF1 Session objects, shared by every loader helper and Streamlit user
+import threading
+import fastf1
+
+from collections import OrderedDict
+
+MAX_CACHE_BYTES = 1024 * 1024 * 1024   # memory budget for all cached sessions (1 GB)
+MAX_CACHED_SESSIONS = 64               # hard cap, in case the size estimate is far off
+
+# Named load profiles: which parts of a session each caller needs (results are always loaded)
+LOAD_PROFILES = {
+    'results-only': {'laps': False, 'telemetry': False, 'weather': False, 'messages': False},
+    'laps-no-telemetry': {'laps': True, 'telemetry': False, 'weather': False, 'messages': False},
+    'laps+messages': {'laps': True, 'telemetry': False, 'weather': False, 'messages': True},
+    'laps+car-data': {'laps': True, 'telemetry': True, 'weather': False, 'messages': False},
+    'full': {'laps': True, 'telemetry': True, 'weather': True, 'messages': True}
+}
+
+_sessions = OrderedDict()   # (season, round, session_type) -> {'session': Session, 'size': bytes, 'parts': set}
+_lock = threading.RLock()
+_loading_locks = {}         # per-key locks, so concurrent users wait for one load instead of parsing twice
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'evictions': 0,
+    'upgrades': 0
+}
+
+def _frame_size(frame) -> int:
+    if frame is None:
+        return 0
+    try:
+        return int(frame.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return 0
+
+def estimate_session_size(session) -> int:
+    # Only the loaded data is counted, the Session object itself is negligible
+    size = 0
+    for attribute in ['_laps', '_results', '_weather_data', '_race_control_messages', '_track_status']:
+        size += _frame_size(getattr(session, attribute, None))
+    for attribute in ['_car_data', '_pos_data']:
+        channels = getattr(session, attribute, None)
+        if isinstance(channels, dict):
+            size += sum(_frame_size(frame) for frame in channels.values())
+    return size
+
+def _cache_bytes() -> int:
+    return sum(entry['size'] for entry in _sessions.values())
+
+def _evict():
+    # Drop the least recently used sessions until the cache fits its budget again
+    while len(_sessions) > 1 and (_cache_bytes() > MAX_CACHE_BYTES or len(_sessions) > MAX_CACHED_SESSIONS):
+        _sessions.popitem(last=False)
+        _stats['evictions'] += 1
+
+def profile_parts(profile:str) -> set:
+    if profile not in LOAD_PROFILES:
+        raise ValueError(f'Unknown load profile {profile}, expected one of {list(LOAD_PROFILES)}')
+    return {part for part, enabled in LOAD_PROFILES[profile].items() if enabled}
+
+def _load_parts(session, parts:set, loaded:set = None):
+    # Only the parts that are missing are requested; results are cheap and always refreshed by fastf1
+    loaded = set() if loaded is None else loaded
+    if {'laps', 'messages'} <= parts and 'messages' not in loaded:
+        # fastf1 only marks deleted laps (from the race control messages) when both are loaded in the same call
+        loaded = loaded - {'laps'}
+    session.load(**{part: part in parts and part not in loaded for part in LOAD_PROFILES['full']})
+
+def load_with_profile(session, profile:str = 'full'):
+    # For sessions that should not live in the shared cache (e.g. one-off loads in notebooks)
+    _load_parts(session, profile_parts(profile))
+    return session
+
+def _lookup(key, parts):
+    entry = _sessions.get(key)
+    if entry is None or not parts <= entry['parts']:
+        return None
+    _stats['hits'] += 1
+    _sessions.move_to_end(key)
+    return entry['session']
+
+def get_cached_session(season, round_name, session_type, profile:str = 'full'):
+    key = (season, round_name, session_type)
+    parts = profile_parts(profile)
+    with _lock:
+        session = _lookup(key, parts)
+        if session is not None:
+            return session
+        key_lock = _loading_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        try:
+            # Another thread may have finished loading this session while we waited
+            with _lock:
+                session = _lookup(key, parts)
+                if session is not None:
+                    return session
+                entry = _sessions.get(key)
+                _stats['misses'] += 1
+
+            if entry is None:
+                session = fastf1.get_session(season, round_name, session_type)
+                loaded = set()
+            else:
+                # Upgrade the lighter load in place instead of starting again from scratch
+                session = entry['session']
+                loaded = entry['parts']
+                _stats['upgrades'] += 1
+            _load_parts(session, parts, loaded)
+
+            with _lock:
+                _sessions[key] = {'session': session, 'size': estimate_session_size(session), 'parts': loaded | parts}
+                _sessions.move_to_end(key)
+                _evict()
+            return session
+        finally:
+            # Also after a failed load, so no per-key lock is left behind
+            with _lock:
+                if _loading_locks.get(key) is key_lock:
+                    _loading_locks.pop(key)
+
+def get_cache_stats() -> dict:
+    with _lock:
+        lookups = _stats['hits'] + _stats['misses']
+        return {
+            **_stats,
+            'hit_rate': _stats['hits'] / lookups if lookups else 0.0,
+            'sessions': len(_sessions),
+            'bytes': _cache_bytes(),
+            'max_bytes': MAX_CACHE_BYTES
+        }
+
+def clear_session_cache():
+    with _lock:
+        _sessions.clear()
+        for counter in _stats:
+            _stats[counter] = 0
@@ -0,0 +1,141 @@
+# Season synergy engine: every round is reduced to per-driver contributions (in batch jobs, with its fastf1 load,
+# on a process pool), whose partial sums add up over any set of rounds; the ledger and feature store build on it
+import os
+import fastf1
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+
+from src.data_ingestion.fastf1_loader import DNF_STATUSES, compute_session_driver_metrics
+from src.data_ingestion.results_store import (stale_seasons, pending_events, record_rounds, ingest_event,
+                                              read_results, read_laps, clean_laps)
+from src.data_ingestion.session_cache import load_with_profile
+from src.utils.scheduler import shared_rate_limits, use_shared_buckets
+
+# Partial sums per driver and round, named like the totals get_synergy_metrics_for_drivers has always returned
+PARTIAL_COLUMNS = ['quali_pos', 'quali_count', 'race_sum', 'race_count', 'dnf_count',
+                   'total_deviation', 'deviation_calculated_races', 'total_lap_delta', 'delta_calculated_races']
+
+def load_race(season, round_number):
+    race = read_results([season], 'R', rounds=[round_number])
+    laps = read_laps([season], 'R', rounds=[round_number])
+
+    # Rounds missing from the warehouse are loaded straight from fastf1 (lap times only)
+    if race.empty:
+        race_session = load_with_profile(fastf1.get_session(season, round_number, 'R'), 'laps-no-telemetry')
+        race = pd.DataFrame(race_session.results)
+        laps = clean_laps(race_session.laps)
+    return race, laps
+
+def _load_round(season, round_number):
+    race, laps = load_race(season, round_number)
+    quali = read_results([season], 'Q', rounds=[round_number])
+    if quali.empty:
+        quali = pd.DataFrame(load_with_profile(fastf1.get_session(season, round_number, 'Q'), 'results-only').results)
+    return quali, race, laps
+
+# One row per driver and round: the round's contribution to that driver's season metrics
+CONTRIBUTION_COLUMNS = ['Driver', 'Abbreviation', 'TeamName', 'TeamColor', 'Season', 'Round',
+                        'QualiPosition', 'RacePosition', 'DNF', 'LapStdev', 'Teammate', 'TeammateDelta']
+
+def round_contributions(season, round_number) -> pd.DataFrame:
+    quali, race, laps = _load_round(season, round_number)
+
+    metrics = compute_session_driver_metrics(laps, race.drop(columns=['Season', 'Round'], errors='ignore'))
+    race_rows = race[['FullName', 'Abbreviation', 'TeamName', 'TeamColor', 'Position', 'Status']].rename(columns={
+        'FullName': 'Driver',
+        'Position': 'RacePosition'
+    })
+    race_rows['DNF'] = race_rows.pop('Status').isin(DNF_STATUSES)
+    race_rows = race_rows.join(metrics[['LapStd', 'Teammate', 'TeammateDelta']].rename(columns={'LapStd': 'LapStdev'}), on='Abbreviation')
+
+    quali_rows = quali[['FullName', 'Position']].rename(columns={'FullName': 'Driver', 'Position': 'QualiPosition'})
+    contributions = race_rows.merge(quali_rows, on='Driver', how='outer')
+    contributions['DNF'] = contributions['DNF'].fillna(False).astype(bool)
+    contributions['Season'] = season
+    contributions['Round'] = round_number
+    return contributions[CONTRIBUTION_COLUMNS]
+
+def run_round_tasks(task, season_rounds:list, max_workers:int = None, processes:bool = True) -> list:
+    # Runs task(season, round, event name) for every round: over a process pool for batch jobs, in-process on
+    # request paths (a Streamlit server should not spawn pools). season_rounds holds (season, round) pairs for
+    # stored rounds and (season, round, event name) for rounds the task ingests first; those are recorded in the
+    # warehouse manifest by this (parent) process once their task succeeded. The workers' fastf1 requests share
+    # one token bucket with this process, so the pool stays within the scheduler's rate limit
+    tasks = [tuple(season_round) + (None,) * (3 - len(season_round)) for season_round in season_rounds]
+    if processes and len(tasks) > 1:
+        workers = min(max_workers or os.cpu_count(), len(tasks))
+        with shared_rate_limits() as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=use_shared_buckets, initargs=(shared,)) as executor:
+                results = list(executor.map(task, *zip(*tasks)))
+    else:
+        results = [task(*season_round) for season_round in tasks]
+
+    ingested = [(season, round_number) for (season, round_number, event_name), result in zip(tasks, results)
+                if event_name is not None and result is not None]
+    if ingested:
+        record_rounds(sorted({season for season, _ in ingested}), ingested)
+    return results
+
+def pending_rounds(seasons) -> list:
+    # (season, round, event name) of the rounds missing from the warehouse, for tasks that ingest them themselves
+    return pending_events(stale_seasons(seasons))
+
+def _round_contributions_task(season, round_number, event_name=None):
+    try:
+        if event_name is not None:
+            # The round's expensive fastf1 load and parse happens here, in the worker
+            ingest_event(season, round_number, event_name)
+        return round_contributions(season, round_number)
+    except Exception as e:
+        print(f'Error for round {round_number} of {season}: {e}')
+        return None
+
+def compute_round_contributions(season_rounds:list, max_workers:int = None, processes:bool = True) -> pd.DataFrame:
+    # Every round is (ingested if needed,) loaded and reduced to its contributions, see run_round_tasks
+    if not season_rounds:
+        return pd.DataFrame(columns=CONTRIBUTION_COLUMNS)
+    contributions = run_round_tasks(_round_contributions_task, season_rounds, max_workers, processes)
+
+    contributions = [round_rows for round_rows in contributions if round_rows is not None]
+    if not contributions:
+        return pd.DataFrame(columns=CONTRIBUTION_COLUMNS)
+    return pd.concat(contributions, ignore_index=True)
+
+def contributions_to_partials(contributions:pd.DataFrame) -> pd.DataFrame:
+    # Partial sums per driver over whichever rounds the contributions cover
+    lap_std = contributions['LapStdev'].fillna(0).astype(float)
+    lap_delta = contributions['TeammateDelta'].fillna(0).astype(float)
+    partials = pd.DataFrame({
+        'quali_pos': contributions['QualiPosition'].fillna(0),
+        'quali_count': contributions['QualiPosition'].notna().astype(int),
+        'race_sum': contributions['RacePosition'].fillna(0),
+        'race_count': contributions['RacePosition'].notna().astype(int),
+        'dnf_count': contributions['DNF'].astype(int),
+        'total_deviation': lap_std,
+        'deviation_calculated_races': (lap_std != 0).astype(int),
+        'total_lap_delta': lap_delta,
+        'delta_calculated_races': (lap_delta != 0).astype(int)
+    })
+    partials.index = contributions['Driver'].values
+    return partials.groupby(level=0).sum()
+
+def finalise_synergies(totals:pd.DataFrame, drivers:list) -> dict:
+    # Same shape as get_synergy_metrics_for_drivers, which compute_synergies_for_season expects
+    drivers_synergies = {}
+    for driver in drivers:
+        driver_dict = {'Teammate_delta': 0, 'Lap_stdev': 0, 'Avg_Q': 0, 'Avg_R': 0, 'DNFRate': 0}
+        driver_totals = totals.loc[driver] if driver in totals.index else pd.Series(0, index=PARTIAL_COLUMNS)
+        driver_dict.update({column: driver_totals[column] for column in PARTIAL_COLUMNS})
+
+        if driver_dict['delta_calculated_races'] != 0:
+            driver_dict['Teammate_delta'] = driver_dict['total_lap_delta'] / driver_dict['delta_calculated_races']
+        if driver_dict['deviation_calculated_races'] != 0:
+            driver_dict['Lap_stdev'] = driver_dict['total_deviation'] / driver_dict['deviation_calculated_races']
+        if driver_dict['quali_count'] != 0:
+            driver_dict['Avg_Q'] = driver_dict['quali_pos'] / driver_dict['quali_count']
+        if driver_dict['race_count'] != 0:
+            driver_dict['Avg_R'] = driver_dict['race_sum'] / driver_dict['race_count']
+            driver_dict['DNFRate'] = (driver_dict['dnf_count'] * 100) / driver_dict['race_count']
+        drivers_synergies[driver] = driver_dict
+    return drivers_synergies
@@ -0,0 +1,82 @@
+# Persisted ledger of per-(driver, season, round) contributions to the synergy metrics. The feature store
+# (and through it the season aggregates) is filled from it, and only rounds the ledger has not seen yet are
+# loaded, so a post-race refresh costs one race load instead of the whole season.
+import os
+import tempfile
+import threading
+import pandas as pd
+
+from src.data_ingestion.results_store import ensure_seasons, stored_rounds
+from src.data_ingestion.synergy_engine import CONTRIBUTION_COLUMNS, compute_round_contributions, pending_rounds
+
+LEDGER_PATH = os.path.join('data', 'synergy_ledger.parquet')
+
+_ledger = None          # in-memory copy of the ledger file
+_lock = threading.Lock()
+
+def _load_ledger() -> pd.DataFrame:
+    global _ledger
+    if _ledger is None:
+        if os.path.exists(LEDGER_PATH):
+            _ledger = pd.read_parquet(LEDGER_PATH)
+        else:
+            _ledger = pd.DataFrame(columns=CONTRIBUTION_COLUMNS)
+    return _ledger
+
+def _save_ledger(ledger:pd.DataFrame):
+    global _ledger
+    # Written to a temporary file of its own first, so a crash or another process saving at the same time
+    # never leaves a half-written ledger behind
+    os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(LEDGER_PATH), suffix='.parquet.tmp', delete=False) as temp_file:
+        temp_path = temp_file.name
+    try:
+        ledger.to_parquet(temp_path, index=False)
+        os.replace(temp_path, LEDGER_PATH)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    _ledger = ledger
+
+def ledger_rounds(season) -> list:
+    ledger = _load_ledger()
+    return sorted(ledger.loc[ledger['Season'] == season, 'Round'].unique().tolist())
+
+def update_ledger(seasons, max_workers:int = None, processes:bool = False) -> pd.DataFrame:
+    # On request paths (processes=False) new rounds are ingested through the shared scheduler and reduced
+    # in-process; batch backfills (processes=True) ingest and reduce every round in a worker process
+    if processes:
+        pending = pending_rounds(seasons)
+    else:
+        ensure_seasons(seasons)
+        pending = []
+    with _lock:
+        ledger = _load_ledger()
+        recorded = set(zip(ledger['Season'], ledger['Round']))
+        missing = [(season, round_number) for season in seasons for round_number in stored_rounds(season)
+                   if (season, round_number) not in recorded] + pending
+        if not missing:
+            return ledger
+
+        new_rows = compute_round_contributions(missing, max_workers, processes)
+        if not new_rows.empty:
+            ledger = pd.concat([ledger, new_rows], ignore_index=True) if not ledger.empty else new_rows
+            ledger = ledger.sort_values(['Season', 'Round', 'Driver'], ignore_index=True)
+            _save_ledger(ledger)
+            print(f'Added {new_rows["Round"].nunique()} round(s) to the synergy ledger')
+        return ledger
+
+def rebuild_ledger(seasons, max_workers:int = None) -> pd.DataFrame:
+    # Drops the seasons' rows (e.g. after re-ingesting them with overwrite) and recomputes them
+    with _lock:
+        ledger = _load_ledger()
+        _save_ledger(ledger.loc[~ledger['Season'].isin(list(seasons))].reset_index(drop=True))
+    return update_ledger(seasons, max_workers, processes=True)
+
+def read_ledger(seasons=None, drivers=None) -> pd.DataFrame:
+    ledger = update_ledger(list(seasons)) if seasons is not None else _load_ledger()
+    if seasons is not None:
+        ledger = ledger.loc[ledger['Season'].isin(list(seasons))]
+    if drivers is not None:
+        ledger = ledger.loc[ledger['Driver'].isin(list(drivers))]
+    return ledger.reset_index(drop=True)
@@ -0,0 +1,80 @@
+# Per-race synergy timeline: the synergy stats of every driver in every race, built in one pass over the
+# stored races (each race loaded once, races spread over processes in batch builds) and kept as a table in the warehouse
+import pandas as pd
+from datetime import datetime
+
+from src.data_ingestion.fastf1_loader import DNF_STATUSES, compute_session_driver_metrics, compute_synergy_score
+from src.data_ingestion.results_store import (FIRST_SEASON, ensure_seasons, ingest_event, stored_rounds, write_synergy_timeline,
+                                              synergy_timeline_rounds, read_synergy_timeline)
+from src.data_ingestion.synergy_engine import load_race, pending_rounds, run_round_tasks
+
+TIMELINE_STATS = ['Teammate_delta', 'Lap_stdev', 'Avg_Q', 'Avg_R', 'DNFRate']
+TIMELINE_COLUMNS = ['Driver', 'Abbreviation', 'TeamName', 'TeamColor', 'Teammate', 'EventName'] + TIMELINE_STATS + ['Synergy']
+
+def race_timeline(season, round_number) -> pd.DataFrame:
+    race, laps = load_race(season, round_number)
+    metrics = compute_session_driver_metrics(laps, race.drop(columns=['Season', 'Round'], errors='ignore'))
+
+    race = race.join(metrics[['LapStd', 'Teammate', 'TeammateDelta']], on='Abbreviation')
+    # Only drivers whose teammate also raced have a synergy for the race
+    race = race.loc[race['Teammate'].notna()]
+
+    timeline = pd.DataFrame({
+        'Driver': race['FullName'],
+        'Abbreviation': race['Abbreviation'],
+        'TeamName': race['TeamName'],
+        'TeamColor': race['TeamColor'],
+        'Teammate': race['Teammate'],
+        'EventName': race['EventName'] if 'EventName' in race.columns else '',
+        'Teammate_delta': race['TeammateDelta'].fillna(0).astype(float),
+        'Lap_stdev': race['LapStd'].fillna(0).astype(float),
+        'Avg_Q': race['GridPosition'].astype(float),
+        'Avg_R': race['Position'].astype(float),
+        'DNFRate': race['Status'].isin(DNF_STATUSES).astype(int)
+    }).reset_index(drop=True)
+    # compute_synergy_score only uses arithmetic, so it scores the whole grid at once
+    timeline['Synergy'] = compute_synergy_score(timeline)
+    return timeline[TIMELINE_COLUMNS]
+
+def _race_timeline_task(season, round_number, event_name=None):
+    # Built and written in the worker, so only the round number travels back to the parent process
+    try:
+        if event_name is not None:
+            ingest_event(season, round_number, event_name)
+        write_synergy_timeline(race_timeline(season, round_number), season, round_number)
+        return round_number
+    except Exception as e:
+        print(f'Error for round {round_number} of {season}: {e}')
+        return None
+
+def build_synergy_timeline(first_season:int = FIRST_SEASON, last_season:int = None, overwrite=False, max_workers:int = None,
+                           processes:bool = True) -> int:
+    # Batch builds (processes=True) ingest and build every missing race in a worker process; request paths
+    # ingest through the shared scheduler and build in-process
+    seasons = list(range(first_season, (last_season or datetime.today().year) + 1))
+    if processes:
+        pending = pending_rounds(seasons)
+    else:
+        ensure_seasons(seasons)
+        pending = []
+
+    tasks = []
+    for season in seasons:
+        done = set() if overwrite else set(synergy_timeline_rounds(season))
+        tasks.extend((season, round_number) for round_number in stored_rounds(season) if round_number not in done)
+    tasks.extend(pending)
+    if not tasks:
+        return 0
+
+    built = run_round_tasks(_race_timeline_task, tasks, max_workers, processes)
+    return sum(round_number is not None for round_number in built)
+
+def get_synergy_timeline(starting_season:int, final_season:int, drivers:list = None) -> pd.DataFrame:
+    # Builds whatever races are missing, then reads the table
+    build_synergy_timeline(starting_season, final_season, processes=False)
+    timeline = read_synergy_timeline(range(starting_season, final_season + 1))
+    if timeline.empty:
+        return pd.DataFrame(columns=['Season', 'Round'] + TIMELINE_COLUMNS)
+    if drivers is not None:
+        timeline = timeline.loc[timeline['Driver'].isin(drivers)]
+    return timeline.sort_values(['Season', 'Round']).reset_index(drop=True)
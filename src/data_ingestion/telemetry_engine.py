@@ -0,0 +1,163 @@
+# Distance-aligned telemetry: every lap is resampled onto the same distance grid (same origin and step),
+# so any number of laps stack into (laps x samples) arrays and comparisons are plain array operations
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+from src.data_ingestion import telemetry_store
+
+GRID_STEP = 5                   # metres between samples of the common grid
+CHANNELS = ['Speed', 'Throttle', 'Brake', 'nGear', 'RPM']
+STEP_CHANNELS = {'Brake', 'nGear'}  # discrete channels keep the last sample instead of being interpolated
+CORNER_WINDOW = 100             # metres either side of a corner's apex searched for the minimum speed
+BRAKE_WINDOW = 300              # metres before a corner's apex searched for the brake point
+MAX_CACHED_LAPS = 256
+
+_laps = OrderedDict()           # (season, round, session, driver, lap) -> resampled arrays, least recently used first
+_lock = threading.Lock()
+
+def lap_key(session, lap) -> tuple:
+    return (session.event.year, int(session.event['RoundNumber']), session.name, lap['Driver'], int(lap['LapNumber']))
+
+def _channel(car_data, channel:str) -> np.ndarray:
+    values = car_data[channel]
+    if isinstance(values, pd.Series) and pd.api.types.is_timedelta64_dtype(values):
+        return values.dt.total_seconds().to_numpy()
+    return np.asarray(values, dtype=float)
+
+def resample_lap(car_data) -> dict:
+    # car_data as returned by Lap.get_car_data().add_distance(), or a lap from the telemetry store
+    distance = _channel(car_data, 'Distance')
+    elapsed = _channel(car_data, 'Time')
+    # Distance must be strictly increasing for the interpolation
+    keep = np.concatenate([[True], np.diff(distance) > 0])
+    distance, elapsed = distance[keep], elapsed[keep]
+
+    grid = np.arange(0, distance[-1], GRID_STEP, dtype=float)
+    previous = np.clip(np.searchsorted(distance, grid, side='right') - 1, 0, len(distance) - 1)
+    arrays = {'Time': np.interp(grid, distance, elapsed)}
+    for channel in CHANNELS:
+        values = _channel(car_data, channel)[keep]
+        arrays[channel] = values[previous] if channel in STEP_CHANNELS else np.interp(grid, distance, values)
+    return arrays
+
+def _cached_lap(key:tuple, load_car_data) -> dict:
+    with _lock:
+        if key in _laps:
+            _laps.move_to_end(key)
+            return _laps[key]
+
+    arrays = resample_lap(load_car_data())
+    with _lock:
+        _laps[key] = arrays
+        while len(_laps) > MAX_CACHED_LAPS:
+            _laps.popitem(last=False)
+    return arrays
+
+def get_lap_arrays(session, lap) -> dict:
+    return _cached_lap(lap_key(session, lap), lambda: lap.get_car_data().add_distance())
+
+def get_stored_lap_arrays(season, round_number, session_type, driver, lap_number) -> dict:
+    return _cached_lap((season, round_number, session_type, driver, int(lap_number)),
+                       lambda: telemetry_store.read_lap(season, round_number, session_type, driver, lap_number))
+
+def stack_laps(laps_arrays:list, labels:list) -> dict:
+    # Stacks the laps on their common grid: the shortest lap's length bounds it
+    samples = min(len(arrays['Time']) for arrays in laps_arrays)
+    aligned = {
+        'Labels': labels,
+        'Distance': np.arange(samples, dtype=float) * GRID_STEP
+    }
+    for channel in ['Time'] + CHANNELS:
+        aligned[channel] = np.stack([arrays[channel][:samples] for arrays in laps_arrays])
+    return aligned
+
+def align_laps(session, laps:list, labels:list = None) -> dict:
+    return stack_laps([get_lap_arrays(session, lap) for lap in laps],
+                      labels if labels is not None else [lap['Driver'] for lap in laps])
+
+def delta_time(aligned:dict, reference:int = 0) -> np.ndarray:
+    # Cumulative gap of every lap to the reference lap along the distance grid (positive = behind)
+    return aligned['Time'] - aligned['Time'][reference]
+
+def corner_tables(aligned:dict, corners:pd.DataFrame) -> dict:
+    # Min speed around each apex and the distance the brakes first went on before it, for every lap at once.
+    # corners as in session.get_circuit_info().corners (Number, Letter, Distance)
+    distance = aligned['Distance']
+    labels = aligned['Labels']
+    corner_names = [f"T{int(number)}{letter or ''}" for number, letter in zip(corners['Number'], corners['Letter'])]
+
+    min_speeds = np.full((len(labels), len(corners)), np.nan)
+    brake_points = np.full((len(labels), len(corners)), np.nan)
+    for index, apex in enumerate(corners['Distance'].to_numpy(dtype=float)):
+        low, high = np.searchsorted(distance, [apex - CORNER_WINDOW, apex + CORNER_WINDOW])
+        if high > low:
+            min_speeds[:, index] = aligned['Speed'][:, low:high].min(axis=1)
+
+        low, high = np.searchsorted(distance, [apex - BRAKE_WINDOW, apex])
+        if high > low:
+            braking = aligned['Brake'][:, low:high] > 0
+            first_brake = braking.argmax(axis=1)
+            brake_points[:, index] = np.where(braking.any(axis=1), distance[low:high][first_brake], np.nan)
+
+    return {
+        'MinSpeed': pd.DataFrame(min_speeds, index=labels, columns=corner_names),
+        'BrakePoint': pd.DataFrame(brake_points, index=labels, columns=corner_names)
+    }
+
+def fastest_laps(session, drivers:list = None) -> tuple:
+    # Every (or the requested) driver's fastest lap, fastest driver first
+    laps = []
+    for driver in drivers if drivers is not None else session.laps['Driver'].unique():
+        driver_laps = session.laps.pick_drivers(driver).pick_quicklaps()
+        if not driver_laps.empty:
+            laps.append(driver_laps.pick_fastest())
+    laps.sort(key=lambda lap: lap['LapTime'])
+    return laps, [lap['Driver'] for lap in laps]
+
+def compare_fastest_laps(session, drivers:list = None) -> dict:
+    # Aligned channels, delta to the fastest lap and corner tables for the drivers' fastest laps
+    laps, labels = fastest_laps(session, drivers)
+    if not laps:
+        return None
+    aligned = align_laps(session, laps, labels)
+    aligned['Delta'] = delta_time(aligned)
+    try:
+        aligned.update(corner_tables(aligned, session.get_circuit_info().corners))
+    except Exception as e:
+        print(f'No corner information for {session}: {e}')
+    return aligned
+
+def fastest_timed_laps(timing:pd.DataFrame, drivers:list = None) -> pd.DataFrame:
+    # Each driver's fastest lap from the timing alone, fastest driver first. Like pick_fastest on each driver's
+    # laps: deleted laps are left out and only personal bests count, so no other driver's pace removes a driver
+    timed = timing.loc[timing['LapTimeSeconds'].notna() & ~timing['Deleted'] & timing['IsPersonalBest']]
+    if drivers is not None:
+        timed = timed.loc[timed['Driver'].isin(drivers)]
+    fastest = timed.loc[timed.groupby('Driver')['LapTimeSeconds'].idxmin()]
+    return fastest.sort_values('LapTimeSeconds').reset_index(drop=True)
+
+def compare_stored_fastest_laps(season, round_number, session_type, drivers:list = None) -> dict:
+    # Same as compare_fastest_laps, served from the telemetry store. The target laps are chosen from the timing,
+    # and only their car data is decoded the first time they are compared
+    timing = telemetry_store.ensure_timing(season, round_number, session_type)
+    fastest = fastest_timed_laps(timing, drivers)
+    telemetry_store.ensure_laps(season, round_number, session_type, fastest)
+    fastest = fastest.loc[[telemetry_store.has_lap(season, round_number, session_type, driver, lap_number)
+                           for driver, lap_number in zip(fastest['Driver'], fastest['LapNumber'])]]
+    if fastest.empty:
+        return None
+
+    laps_arrays = [get_stored_lap_arrays(season, round_number, session_type, driver, lap_number)
+                   for driver, lap_number in zip(fastest['Driver'], fastest['LapNumber'])]
+    aligned = stack_laps(laps_arrays, fastest['Driver'].tolist())
+    aligned['Delta'] = delta_time(aligned)
+    corners = telemetry_store.read_corners(season, round_number, session_type)
+    if corners is not None:
+        aligned.update(corner_tables(aligned, corners))
+    return aligned
+
+def clear_telemetry_cache():
+    with _lock:
+        _laps.clear()
@@ -0,0 +1,177 @@
+# On-disk per-lap telemetry store: each lap's car data is one compact structured NumPy array, read back with
+# memory mapping, so slicing laps is zero-copy and every Streamlit worker shares the OS page cache.
+# data/telemetry/<season>/<round>/<session>/timing.parquet   every lap of the session (timing only)
+# data/telemetry/<season>/<round>/<session>/<driver>/<lap>.npy  car data of the laps that were stored
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+from src.data_ingestion.session_cache import get_cached_session
+
+STORE_PATH = os.path.join('data', 'telemetry')
+MAX_CACHED_TIMINGS = 64
+
+# Time and Distance are relative to the start of the lap
+LAP_DTYPE = np.dtype([
+    ('Time', 'f4'),
+    ('Distance', 'f4'),
+    ('Speed', 'i2'),
+    ('Throttle', 'u1'),
+    ('Brake', '?'),
+    ('nGear', 'i1'),
+    ('RPM', 'i2')
+])
+TIMING_COLUMNS = ['Driver', 'DriverNumber', 'Team', 'LapNumber', 'LapTimeSeconds', 'LapStartSeconds', 'LapEndSeconds', 'IsAccurate',
+                  'IsPersonalBest', 'Deleted']
+
+_timing = OrderedDict()         # session directory -> timing frame, least recently used first
+_load_reports = OrderedDict()   # session directory -> report of the last selective car data load
+_lock = threading.Lock()
+
+def _session_dir(season, round_number, session_type) -> str:
+    return os.path.join(STORE_PATH, str(season), str(round_number), session_type)
+
+def _lap_path(season, round_number, session_type, driver, lap_number) -> str:
+    return os.path.join(_session_dir(season, round_number, session_type), driver, f'{int(lap_number)}.npy')
+
+def _save_array(path:str, array:np.ndarray):
+    # Written to a temporary file first, so readers never map a half-written lap
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.{threading.get_ident()}.tmp.npy'
+    np.save(temp_path, array)
+    os.replace(temp_path, path)
+
+def timing_from_laps(laps) -> pd.DataFrame:
+    laps = pd.DataFrame(laps)
+    return pd.DataFrame({
+        'Driver': laps['Driver'],
+        'DriverNumber': laps['DriverNumber'].astype(str),
+        'Team': laps['Team'],
+        'LapNumber': laps['LapNumber'].astype('int16'),
+        'LapTimeSeconds': laps['LapTime'].dt.total_seconds(),
+        'LapStartSeconds': laps['LapStartTime'].dt.total_seconds(),
+        'LapEndSeconds': laps['Time'].dt.total_seconds(),
+        'IsAccurate': laps['IsAccurate'].fillna(False).astype(bool),
+        'IsPersonalBest': laps['IsPersonalBest'].fillna(False).astype(bool),
+        'Deleted': laps['Deleted'].fillna(False).astype(bool)
+    }).reset_index(drop=True)
+
+def write_timing(season, round_number, session_type, laps):
+    path = os.path.join(_session_dir(season, round_number, session_type), 'timing.parquet')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    timing = timing_from_laps(laps)
+    timing.to_parquet(path, index=False)
+    _cache_timing(os.path.dirname(path), timing)
+
+def _cache_timing(session_dir:str, timing:pd.DataFrame):
+    with _lock:
+        _timing[session_dir] = timing
+        _timing.move_to_end(session_dir)
+        while len(_timing) > MAX_CACHED_TIMINGS:
+            _timing.popitem(last=False)
+
+def read_timing(season, round_number, session_type) -> pd.DataFrame:
+    # None when the session was never stored
+    session_dir = _session_dir(season, round_number, session_type)
+    with _lock:
+        if session_dir in _timing:
+            _timing.move_to_end(session_dir)
+            return _timing[session_dir]
+    path = os.path.join(session_dir, 'timing.parquet')
+    if not os.path.exists(path):
+        return None
+    timing = pd.read_parquet(path)
+    if not set(TIMING_COLUMNS) <= set(timing.columns):
+        # Written by an older version of the store, loaded again
+        return None
+    _cache_timing(session_dir, timing)
+    return timing
+
+def write_lap(season, round_number, session_type, driver, lap_number, car_data:pd.DataFrame):
+    # car_data as returned by Lap.get_car_data().add_distance()
+    lap = np.empty(len(car_data), dtype=LAP_DTYPE)
+    lap['Time'] = car_data['Time'].dt.total_seconds().to_numpy()
+    lap['Distance'] = car_data['Distance'].to_numpy()
+    for channel in ['Speed', 'Throttle', 'Brake', 'nGear', 'RPM']:
+        lap[channel] = car_data[channel].to_numpy()
+    _save_array(_lap_path(season, round_number, session_type, driver, lap_number), lap)
+
+def has_lap(season, round_number, session_type, driver, lap_number) -> bool:
+    return os.path.exists(_lap_path(season, round_number, session_type, driver, lap_number))
+
+def read_lap(season, round_number, session_type, driver, lap_number) -> np.ndarray:
+    # Memory-mapped structured array; lap['Speed'] etc. are views into the mapped file
+    return np.load(_lap_path(season, round_number, session_type, driver, lap_number), mmap_mode='r')
+
+def write_corners(season, round_number, session_type, corners:pd.DataFrame):
+    path = os.path.join(_session_dir(season, round_number, session_type), 'corners.parquet')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    corners[['Number', 'Letter', 'Distance']].to_parquet(path, index=False)
+
+def read_corners(season, round_number, session_type) -> pd.DataFrame:
+    path = os.path.join(_session_dir(season, round_number, session_type), 'corners.parquet')
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+def write_session_laps(season, round_number, session_type, session, laps:pd.DataFrame):
+    # Car data of the requested timing rows (Driver, LapNumber) from a session loaded with its car data
+    try:
+        write_corners(season, round_number, session_type, session.get_circuit_info().corners)
+    except Exception as e:
+        print(f'No corner information for {season} round {round_number} {session_type}: {e}')
+
+    for driver, lap_number in zip(laps['Driver'], laps['LapNumber']):
+        try:
+            lap = session.laps.pick_drivers(driver).pick_laps(int(lap_number)).iloc[0]
+            write_lap(season, round_number, session_type, driver, lap_number, lap.get_car_data().add_distance())
+        except Exception as e:
+            print(f'No car data for {driver} lap {lap_number}: {e}')
+
+def ensure_timing(season, round_number, session_type) -> pd.DataFrame:
+    # Timing only: the session is loaded without any telemetry the first time. The race control messages are
+    # needed as well, fastf1 derives the Deleted and IsPersonalBest flags of the laps from them
+    timing = read_timing(season, round_number, session_type)
+    if timing is None:
+        session = get_cached_session(season, round_number, session_type, 'laps+messages')
+        write_timing(season, round_number, session_type, session.laps)
+        timing = read_timing(season, round_number, session_type)
+    return timing
+
+def ensure_laps(season, round_number, session_type, laps:pd.DataFrame) -> dict:
+    # Stores the car data of the requested timing rows that are not stored yet, decoding only their drivers and
+    # time windows; falls back to a full car data load when the raw stream cannot be used. Returns the load report
+    missing = laps.loc[[not has_lap(season, round_number, session_type, driver, lap_number)
+                        for driver, lap_number in zip(laps['Driver'], laps['LapNumber'])]]
+    if missing.empty:
+        return None
+
+    start = time.perf_counter()
+    # Same profile as ensure_timing, so this is normally a cache hit
+    session = get_cached_session(season, round_number, session_type, 'laps+messages')
+    try:
+        # Imported here, so a fastf1 release that moves its internals only disables the selective load
+        from src.data_ingestion.selective_telemetry import load_lap_car_data
+        laps_car_data, report = load_lap_car_data(session, missing)
+        for driver, lap_number, car_data in zip(missing['Driver'], missing['LapNumber'], laps_car_data):
+            write_lap(season, round_number, session_type, driver, lap_number, car_data)
+    except Exception as e:
+        print(f'Selective car data load failed for {season} round {round_number} {session_type}, loading all of it: {e}')
+        session = get_cached_session(season, round_number, session_type, 'laps+car-data')
+        write_session_laps(season, round_number, session_type, session, missing)
+        report = {'selective': False}
+    else:
+        report['selective'] = True
+    report['seconds'] = time.perf_counter() - start
+    report['laps'] = len(missing)
+    with _lock:
+        _load_reports[_session_dir(season, round_number, session_type)] = report
+        while len(_load_reports) > MAX_CACHED_TIMINGS:
+            _load_reports.popitem(last=False)
+    return report
+
+def load_report(season, round_number, session_type) -> dict:
+    # Report of the last car data load of the session in this process, None when nothing was loaded
+    with _lock:
+        return _load_reports.get(_session_dir(season, round_number, session_type))
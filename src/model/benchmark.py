@@ -0,0 +1,86 @@
+# Benchmark of the synergy model's real code path (train_model, save_model, load_model and predict) on the
+# historic dataset and on copies of it scaled up by resampling rows with a little noise.
+# Memory is the process's peak RSS, which includes the native allocations of scikit-learn's trees.
+# python -m src.model.benchmark [scale ...]
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, memory is then reported as NaN
+    resource = None
+
+from src.model import model
+from src.model.model import FEATURES, data_cleaning, train_model, save_model, load_model, predict, clear_model_cache
+
+SCALES = [1, 10, 100]
+PREDICT_REPEATS = 5
+
+def scale_dataset(dataframe:pd.DataFrame, scale:int, seed:int = 42) -> pd.DataFrame:
+    if scale == 1:
+        return dataframe
+    rng = np.random.default_rng(seed)
+    scaled = dataframe.iloc[rng.integers(0, len(dataframe), len(dataframe) * scale)].reset_index(drop=True)
+    # Noise proportional to each column's spread, so the trees do not just memorise duplicated rows
+    noise = rng.normal(0, 0.05, size=(len(scaled), len(FEATURES))) * dataframe[FEATURES].std().to_numpy()
+    scaled[FEATURES] = scaled[FEATURES].to_numpy() + noise
+    return scaled
+
+def peak_rss_mb() -> float:
+    # Peak resident set size of this process so far (kilobytes on Linux, bytes on macOS)
+    if resource is None:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+def _measure(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start, peak_rss_mb()
+
+def benchmark(scales:list = SCALES) -> pd.DataFrame:
+    base = data_cleaning(pd.DataFrame()).reset_index(drop=True)
+    report = []
+    # Artifacts go to a scratch directory, so benchmark runs do not add versions to data/models
+    models_dir = model.MODELS_DIR
+    model.MODELS_DIR = tempfile.mkdtemp(prefix='synergy_benchmark_')
+    try:
+        for scale in scales:
+            dataframe = scale_dataset(base, scale)
+            artifact, fit_seconds, fit_peak = _measure(lambda: train_model(dataframe, save=False))
+            version, save_seconds, _ = _measure(lambda: save_model(artifact))
+
+            # Dropped from the process cache, so the load really unpickles the artifact
+            clear_model_cache()
+            _, load_seconds, load_peak = _measure(lambda: load_model(version))
+            features = dataframe[FEATURES]
+            _, predict_seconds, predict_peak = _measure(lambda: [predict(features, version) for _ in range(PREDICT_REPEATS)])
+
+            report.append({
+                'Scale': scale,
+                'Rows': len(dataframe),
+                'FitSeconds': fit_seconds,
+                'SaveSeconds': save_seconds,
+                'LoadSeconds': load_seconds,
+                'PredictRowsPerSecond': len(dataframe) * PREDICT_REPEATS / predict_seconds,
+                # Peak RSS only grows, so each column is the process peak at the end of that step
+                'FitPeakRSSMB': fit_peak,
+                'LoadPeakRSSMB': load_peak,
+                'PredictPeakRSSMB': predict_peak
+            })
+            print(f'x{scale}: {len(dataframe)} rows, fit {fit_seconds:.2f}s, load {load_seconds:.2f}s, '
+                  f'predict {report[-1]["PredictRowsPerSecond"]:.0f} rows/s, peak RSS {predict_peak:.0f} MB')
+    finally:
+        clear_model_cache()
+        shutil.rmtree(model.MODELS_DIR, ignore_errors=True)
+        model.MODELS_DIR = models_dir
+    return pd.DataFrame(report)
+
+if __name__ == '__main__':
+    scales = [int(arg) for arg in sys.argv[1:]] or SCALES
+    print(benchmark(scales).to_string(index=False))
@@ -2,6 +2,13 @@ import pandas as pd
 import numpy as np
 import sys
 import os
+import json
+import hashlib
+import threading
+import joblib
+import sklearn
+from datetime import datetime
+from collections import namedtuple, OrderedDict
 
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
@@ -11,15 +18,40 @@ from sklearn.preprocessing import MinMaxScaler
 from src.data_ingestion.fastf1_loader import get_synergy_metrics, get_synergy_metrics_for_drivers
 from src.data_ingestion.openf1_loader import get_drivers_for_season
 
-weights = {
-    'Teammate_delta': 2.0,
-    'Lap_stdev': 1.5,
-    'Avg_Q': 0.5,
-    'Avg_R': 1.0,
-    'DNFRate': 3.0
-}
+FEATURES = ['Teammate_delta', 'Lap_stdev', 'Avg_Q', 'Avg_R', 'DNFRate']
+HISTORIC_DIR = os.path.join('data', 'historic_synergies')
+HISTORIC_SEASONS = range(2020, 2025)
+WEIGHTS_PATH = os.path.join(HISTORIC_DIR, 'synergy_weights.json')
 
-def compute_synergy_score(metrics: dict) -> float:
+MAX_CACHED_SNAPSHOTS = 32
+MODELS_DIR = os.path.join('data', 'models')
+
+# Weights are immutable snapshots: changing a weight creates a new snapshot instead of mutating shared state,
+# so every Streamlit session keeps its own weights and results are cached per snapshot
+Weights = namedtuple('Weights', FEATURES)
+DEFAULT_WEIGHTS = Weights(Teammate_delta=2.0, Lap_stdev=1.5, Avg_Q=0.5, Avg_R=1.0, DNFRate=3.0)
+
+_historic = None                # every historic season in memory, as read from the CSVs
+_normalised = OrderedDict()     # snapshot key -> cleaned and MinMax normalised scores, least recently used first
+_lock = threading.Lock()
+_models = {}                    # version -> loaded model artifact, so a process loads each version once
+
+def as_weights(weights=None) -> Weights:
+    # Accepts a snapshot, a dict keyed by feature or a list in FEATURES order
+    if weights is None:
+        return DEFAULT_WEIGHTS
+    if isinstance(weights, Weights):
+        return weights
+    if isinstance(weights, dict):
+        return Weights(**{feature: float(weights[feature]) for feature in FEATURES})
+    return Weights(*[float(weight) for weight in weights])
+
+def weights_key(weights=None) -> str:
+    # Content hash of a snapshot, equal snapshots share cached results
+    return hashlib.sha1(json.dumps(list(as_weights(weights))).encode('utf-8')).hexdigest()[:16]
+
+def compute_synergy_score(metrics: dict, weights=None) -> float:
+    weights = as_weights(weights)._asdict()
     score = (
         -metrics['Teammate_delta'] * weights['Teammate_delta'] +  # negative delta = faster than teammate
         -metrics['Lap_stdev'] * weights['Lap_stdev'] +     # lower std dev = more consistent
@@ -29,6 +61,14 @@ def compute_synergy_score(metrics: dict) -> float:
     )
     return score
 
+def weight_vector(weights=None) -> np.ndarray:
+    # Every feature is better when lower, hence the negated weights
+    return -np.array(as_weights(weights), dtype=float)
+
+def compute_synergy_scores(features, weights=None) -> np.ndarray:
+    # Scores every row of a (rows x FEATURES) matrix in one matrix-vector product
+    return np.asarray(features, dtype=float) @ weight_vector(weights)
+
 def compute_historic_synergies():
     driver_season_data = []
     for season in [2023, 2024]:
@@ -77,11 +117,23 @@ def compute_synergies_for_season():
     except Exception as e:
         print(str(e))
 
-def data_cleaning(dataframe):
-    # read each csv as a dataframe and concatenate it to the initial dataframe
-    for year in range(2020, 2025):
-        df = pd.read_csv(f'data\\historic_synergies\\historic_data_{year}.csv')
-        dataframe = pd.concat([dataframe, df])
+def load_historic_data(reload:bool = False) -> pd.DataFrame:
+    # The yearly CSVs are read once and never modified in memory, every snapshot scores its own copy
+    global _historic
+    with _lock:
+        if _historic is None or reload:
+            _historic = pd.concat([pd.read_csv(os.path.join(HISTORIC_DIR, f'historic_data_{year}.csv')) for year in HISTORIC_SEASONS],
+                                  ignore_index=True)
+            _normalised.clear()
+        return _historic
+
+def score_historic_data(weights=None) -> pd.DataFrame:
+    historic = load_historic_data()
+    return historic.assign(SynergyScore=compute_synergy_scores(historic[FEATURES].to_numpy(), weights))
+
+def data_cleaning(dataframe, weights=None):
+    # concatenate every historic season, scored with the given weights, to the initial dataframe
+    dataframe = pd.concat([dataframe, score_historic_data(weights)])
 
     dataframe = dataframe.dropna(subset=['SynergyScore']) # Remove invalid Synergy scores
     dataframe = dataframe.loc[dataframe['SynergyScore'] != 0] # Remove rows with Synergy Score 0 (most likely errors)
@@ -90,15 +142,12 @@ def data_cleaning(dataframe):
 
     return dataframe
 
-def get_weights():
-    return weights
+def get_weights(weights=None) -> dict:
+    return as_weights(weights)._asdict()
 
-def set_weights(teammate_delta, lap_stdev, avg_q, avg_r, dnf_rate):
-    weights['Teammate_delta'] = teammate_delta
-    weights['Lap_stdev'] = lap_stdev
-    weights['Avg_Q'] = avg_q
-    weights['Avg_R'] = avg_r
-    weights['DNFRate'] = dnf_rate
+def set_weights(teammate_delta, lap_stdev, avg_q, avg_r, dnf_rate) -> Weights:
+    # Returns a new snapshot, callers keep it (e.g. in their Streamlit session) instead of changing shared state
+    return Weights(teammate_delta, lap_stdev, avg_q, avg_r, dnf_rate)
 
 def model_features_importance(model, X):
     importances = model.feature_importances_
@@ -110,8 +159,8 @@ def model_features_importance(model, X):
 
     return sorted_features, sorted_importances
 
-def train_model(dataframe):
-    X = dataframe[['Teammate_delta', 'Lap_stdev', 'Avg_Q', 'Avg_R', 'DNFRate']]
+def train_model(dataframe, weights=None, save:bool = True) -> dict:
+    X = dataframe[FEATURES]
     y = dataframe['SynergyScore']
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -120,25 +169,178 @@ def train_model(dataframe):
     model.fit(X_train, y_train)
 
     predictions = model.predict(X_test)
-    print("Test RMSE: ", root_mean_squared_error(y_test, predictions))
-    print(y_test)
-    print(predictions)
-
-def recalculate_synergy():
-    for year in range(2020, 2025):
-        df = pd.read_csv(f'data/historic_synergies/historic_data_{year}.csv')
-        for index, driver in df.iterrows():
-            metrics = driver[['Teammate_delta', 'Lap_stdev', 'Avg_Q', 'Avg_R', 'DNFRate']]
-            new_syn = compute_synergy_score(metrics)
-            df.loc[index, 'SynergyScore'] = new_syn
-        df.to_csv(f'data\\historic_synergies\\historic_data_{year}.csv', index=False) # update the CSV file
-
-    normalised_df = pd.DataFrame()
-    normalised_df = data_cleaning(normalised_df)[['Driver', 'Season', 'SynergyScore']]
-    scaler = MinMaxScaler(feature_range=(0, 100))
-    normalised_df['SynergyScore'] = scaler.fit_transform(normalised_df[['SynergyScore']]) 
-    normalised_df.to_csv(f'data\\historic_synergies\\normalised_synergies.csv', index=False)
+    rmse = root_mean_squared_error(y_test, predictions)
+    print("Test RMSE: ", rmse)
+
+    artifact = {
+        'model': model,
+        'features': FEATURES,
+        'weights': get_weights(weights),
+        'metrics': {'rmse': float(rmse), 'train_rows': len(X_train), 'test_rows': len(X_test)},
+        'trained_at': datetime.now().isoformat(timespec='seconds'),
+        'sklearn_version': sklearn.__version__
+    }
+    if save:
+        save_model(artifact)
+    return artifact
+
+def _model_path(version:int, extension:str = 'joblib') -> str:
+    return os.path.join(MODELS_DIR, f'synergy_model-v{version}.{extension}')
+
+def model_versions() -> list:
+    if not os.path.isdir(MODELS_DIR):
+        return []
+    return sorted(int(name[len('synergy_model-v'):-len('.joblib')]) for name in os.listdir(MODELS_DIR)
+                  if name.startswith('synergy_model-v') and name.endswith('.joblib'))
+
+def save_model(artifact:dict) -> int:
+    # Every save is a new version; the JSON sidecar keeps the schema and metrics readable without unpickling
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    versions = model_versions()
+    artifact['version'] = versions[-1] + 1 if versions else 1
+    joblib.dump(artifact, _model_path(artifact['version']))
+    with open(_model_path(artifact['version'], 'json'), 'w') as metadata_file:
+        json.dump({key: value for key, value in artifact.items() if key != 'model'}, metadata_file, indent=2)
+    with _lock:
+        _models[artifact['version']] = artifact
+    return artifact['version']
+
+def load_model(version:int = None) -> dict:
+    # Latest version by default; each version is unpickled once per process
+    if version is None:
+        versions = model_versions()
+        if not versions:
+            raise FileNotFoundError(f'No synergy model in {MODELS_DIR}, train one with train_model first')
+        version = versions[-1]
+    with _lock:
+        if version in _models:
+            return _models[version]
+    artifact = joblib.load(_model_path(version))
+    if artifact['sklearn_version'] != sklearn.__version__:
+        print(f'Model v{version} was trained with scikit-learn {artifact["sklearn_version"]}, running {sklearn.__version__}')
+    with _lock:
+        _models[version] = artifact
+    return artifact
+
+def clear_model_cache():
+    with _lock:
+        _models.clear()
+
+def predict(features, version:int = None) -> np.ndarray:
+    # Batch prediction over any frame (or matrix in FEATURES order) holding the model's feature columns
+    artifact = load_model(version)
+    if isinstance(features, pd.DataFrame):
+        missing = [feature for feature in artifact['features'] if feature not in features.columns]
+        if missing:
+            raise ValueError(f'Missing model features: {missing}')
+        features = features[artifact['features']]
+    else:
+        features = pd.DataFrame(np.atleast_2d(np.asarray(features, dtype=float)), columns=artifact['features'])
+    return artifact['model'].predict(features)
+
+def recalculate_synergy(weights=None, save:bool = False) -> pd.DataFrame:
+    # Rescores and renormalises in memory, cached per snapshot; files are only written when asked to
+    weights = as_weights(weights)
+    key = weights_key(weights)
+    with _lock:
+        if key in _normalised:
+            _normalised.move_to_end(key)
+            normalised_df = _normalised[key]
+        else:
+            normalised_df = None
+
+    if normalised_df is None:
+        normalised_df = data_cleaning(pd.DataFrame(), weights)[['Driver', 'Season', 'SynergyScore']].reset_index(drop=True)
+        scaler = MinMaxScaler(feature_range=(0, 100))
+        normalised_df['SynergyScore'] = scaler.fit_transform(normalised_df[['SynergyScore']])
+        with _lock:
+            _normalised[key] = normalised_df
+            while len(_normalised) > MAX_CACHED_SNAPSHOTS:
+                _normalised.popitem(last=False)
+
+    if save:
+        save_synergies(weights)
+    return normalised_df
+
+def get_normalised_synergies(weights=None) -> pd.DataFrame:
+    # Scores under the saved weights by default, i.e. the ones in normalised_synergies.csv
+    return recalculate_synergy(weights if weights is not None else load_saved_weights())
+
+def load_saved_weights() -> Weights:
+    # Weights of the last save_synergies, the defaults until scores were saved
+    if not os.path.exists(WEIGHTS_PATH):
+        return DEFAULT_WEIGHTS
+    with open(WEIGHTS_PATH) as weights_file:
+        return as_weights(json.load(weights_file))
+
+def save_synergies(weights=None):
+    # Writes the yearly CSVs and normalised_synergies.csv for the given weights, and the weights themselves
+    weights = as_weights(weights)
+    historic = score_historic_data(weights)
+    for year in HISTORIC_SEASONS:
+        historic.loc[historic['Season'] == year].to_csv(os.path.join(HISTORIC_DIR, f'historic_data_{year}.csv'), index=False)
+    get_normalised_synergies(weights).to_csv(os.path.join(HISTORIC_DIR, 'normalised_synergies.csv'), index=False)
+
+    temp_path = f'{WEIGHTS_PATH}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'w') as weights_file:
+        json.dump(get_weights(weights), weights_file, indent=2)
+    os.replace(temp_path, WEIGHTS_PATH)
+
+def sample_weight_vectors(count:int = 1000, spread:float = 0.5, weights=None, seed:int = 42) -> np.ndarray:
+    # Log-normal perturbations around the given (or default) weights, one vector per row
+    base = -weight_vector(weights)
+    rng = np.random.default_rng(seed)
+    return base * rng.lognormal(mean=0.0, sigma=spread, size=(count, len(FEATURES)))
+
+def _kendall_tau(baseline:np.ndarray, scores:np.ndarray, chunk_size:int = 512) -> np.ndarray:
+    # Tau-b of every scores column against the baseline, from the signs of all pairwise differences
+    first, second = np.triu_indices(len(baseline), k=1)
+    baseline_signs = np.sign(baseline[first] - baseline[second])
+    taus = np.empty(scores.shape[1])
+    for start in range(0, scores.shape[1], chunk_size):
+        chunk = scores[:, start:start + chunk_size]
+        signs = np.sign(chunk[first] - chunk[second])
+        denominator = np.sqrt(np.count_nonzero(baseline_signs) * np.count_nonzero(signs, axis=0))
+        taus[start:start + chunk_size] = np.divide(baseline_signs @ signs, denominator,
+                                                   out=np.zeros(chunk.shape[1]), where=denominator > 0)
+    return taus
+
+def sweep_weights(weight_vectors, weights=None, top:int = 10) -> dict:
+    # Scores every driver-season under every weight vector as one (rows x FEATURES) @ (FEATURES x vectors) product
+    if isinstance(weight_vectors, pd.DataFrame):
+        weight_vectors = weight_vectors[FEATURES]
+    elif len(weight_vectors) and isinstance(weight_vectors[0], dict):
+        weight_vectors = [[vector[feature] for feature in FEATURES] for vector in weight_vectors]
+    weight_vectors = np.atleast_2d(np.asarray(weight_vectors, dtype=float))
+
+    rows = data_cleaning(pd.DataFrame(), weights).reset_index(drop=True)
+    features = rows[FEATURES].to_numpy(dtype=float)
+    scores = features @ -weight_vectors.T
+    baseline = rows['SynergyScore'].to_numpy(dtype=float)
+
+    # Rank 1 is the best synergy under that vector
+    ranks = np.argsort(np.argsort(-scores, axis=0), axis=0) + 1
+    baseline_ranks = np.argsort(np.argsort(-baseline)) + 1
+
+    labels = rows['Driver'] + ' (' + rows['Season'].astype(str) + ')'
+    stability = pd.DataFrame({
+        'Driver': rows['Driver'].to_numpy(),
+        'Season': rows['Season'].to_numpy(),
+        'CurrentRank': baseline_ranks,
+        'MeanRank': ranks.mean(axis=1),
+        'RankStdev': ranks.std(axis=1),
+        'BestRank': ranks.min(axis=1),
+        'WorstRank': ranks.max(axis=1),
+        f'Top{top}Share': (ranks <= top).mean(axis=1)
+    }, index=labels).sort_values('MeanRank')
+
+    return {
+        'weights': pd.DataFrame(weight_vectors, columns=FEATURES),
+        'ranks': pd.DataFrame(ranks, index=labels),
+        'stability': stability,
+        'kendall_tau': _kendall_tau(baseline, scores)
+    }
 
 def set_weights_and_update_synergy(weights_list):
-    set_weights(weights_list[0], weights_list[1], weights_list[2], weights_list[3], weights_list[4])
-    recalculate_synergy()
+    weights = set_weights(weights_list[0], weights_list[1], weights_list[2], weights_list[3], weights_list[4])
+    return weights, recalculate_synergy(weights)
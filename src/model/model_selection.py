@@ -0,0 +1,113 @@
+# Model selection for the synergy regressor: successive-halving search over each candidate model, scored with
+# cross-validation grouped by driver (so a driver's seasons never sit on both sides of a split), on all cores.
+# python -m src.model.model_selection
+import time
+import sklearn
+import pandas as pd
+from datetime import datetime
+
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401, enables HalvingGridSearchCV
+from sklearn.model_selection import GroupKFold, HalvingGridSearchCV
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+
+from src.model.model import FEATURES, data_cleaning, get_weights, save_model
+
+CV_SPLITS = 5
+
+# Each model is searched over its grid, with the resource successive halving grows between rounds:
+# more trees for the forest, more boosting iterations (cut short by early stopping) for the booster
+SEARCH_SPACES = {
+    'random_forest': {
+        'estimator': RandomForestRegressor(random_state=42),
+        'resource': 'n_estimators',
+        'min_resources': 25,
+        'max_resources': 400,
+        'grid': {
+            'max_depth': [None, 8, 16],
+            'min_samples_leaf': [1, 2, 4],
+            'max_features': [1.0, 'sqrt']
+        }
+    },
+    'hist_gradient_boosting': {
+        'estimator': HistGradientBoostingRegressor(early_stopping=True, validation_fraction=0.15,
+                                                   n_iter_no_change=10, random_state=42),
+        'resource': 'max_iter',
+        'min_resources': 50,
+        'max_resources': 800,
+        'grid': {
+            'learning_rate': [0.03, 0.1, 0.3],
+            'max_leaf_nodes': [7, 15, 31],
+            'min_samples_leaf': [5, 10, 20],
+            'l2_regularization': [0.0, 1.0]
+        }
+    }
+}
+
+def search_model(name:str, X:pd.DataFrame, y:pd.Series, groups:pd.Series, n_splits:int = CV_SPLITS, n_jobs:int = -1):
+    space = SEARCH_SPACES[name]
+    search = HalvingGridSearchCV(space['estimator'], space['grid'], factor=3,
+                                 resource=space['resource'], min_resources=space['min_resources'], max_resources=space['max_resources'],
+                                 cv=GroupKFold(n_splits=n_splits), scoring='neg_root_mean_squared_error',
+                                 n_jobs=n_jobs, refit=True, random_state=42)
+    start = time.perf_counter()
+    search.fit(X, y, groups=groups)
+    wall_seconds = time.perf_counter() - start
+
+    results = pd.DataFrame(search.cv_results_)
+    report = pd.DataFrame({
+        'Model': name,
+        'Params': results['params'].astype(str),
+        'Iteration': results['iter'],
+        'Resources': results['n_resources'],
+        'RMSE': -results['mean_test_score'],
+        'RMSEStdev': results['std_test_score'],
+        # Total time the candidate's folds took, i.e. its cost if it had run alone
+        'FitSeconds': (results['mean_fit_time'] + results['mean_score_time']) * n_splits
+    })
+    print(f'{name}: best RMSE {-search.best_score_:.4f} in {wall_seconds:.1f}s wall time')
+    return search, report, wall_seconds
+
+def select_model(dataframe:pd.DataFrame = None, models:list = None, weights=None, n_splits:int = CV_SPLITS,
+                 n_jobs:int = -1, save:bool = True) -> dict:
+    # Searches every model, keeps the one with the lowest cross-validated RMSE and saves it as a model artifact
+    if dataframe is None:
+        dataframe = data_cleaning(pd.DataFrame(), weights)
+    dataframe = dataframe.reset_index(drop=True)
+    X = dataframe[FEATURES]
+    y = dataframe['SynergyScore']
+    groups = dataframe['Driver']
+
+    searches = {}
+    reports = []
+    wall_times = {}
+    for name in models or list(SEARCH_SPACES):
+        searches[name], report, wall_times[name] = search_model(name, X, y, groups, n_splits, n_jobs)
+        reports.append(report)
+
+    report = pd.concat(reports, ignore_index=True).sort_values('RMSE', ignore_index=True)
+    best_name = min(searches, key=lambda name: -searches[name].best_score_)
+    best = searches[best_name]
+
+    artifact = {
+        'model': best.best_estimator_,
+        'features': FEATURES,
+        'weights': get_weights(weights),
+        'metrics': {
+            'cv_rmse': float(-best.best_score_),
+            'cv_splits': n_splits,
+            'model': best_name,
+            'params': {key: str(value) for key, value in best.best_params_.items()},
+            'search_wall_seconds': wall_times,
+            'train_rows': len(dataframe)
+        },
+        'trained_at': datetime.now().isoformat(timespec='seconds'),
+        'sklearn_version': sklearn.__version__
+    }
+    if save:
+        save_model(artifact)
+    return {'artifact': artifact, 'report': report, 'wall_seconds': wall_times}
+
+if __name__ == '__main__':
+    selection = select_model()
+    print(selection['report'].head(20).to_string(index=False))
+    print(f"Saved {selection['artifact']['metrics']['model']} as model v{selection['artifact'].get('version')}")
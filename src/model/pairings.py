@@ -0,0 +1,64 @@
+# What-if pairings: every driver of a season paired with every team's car, scored by the synergy model in one batch.
+# A pairing keeps the driver's own teammate delta and how far the driver was from their team's average,
+# and puts that on top of the other team's season aggregates.
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+from src.data_ingestion.feature_store import season_aggregates, team_aggregates
+from src.model.model import FEATURES, as_weights, data_cleaning, load_model, predict
+
+MAX_CACHED_PAIRINGS = 16
+MAX_POSITION = 20
+
+_pairings = OrderedDict()   # (model version, season, drivers) -> pairing table, least recently used first
+_lock = threading.Lock()
+
+def pairing_features(season:int, drivers:list = None) -> pd.DataFrame:
+    drivers_aggregates = season_aggregates(season).dropna(subset=['TeamName'])
+    if drivers is not None:
+        drivers_aggregates = drivers_aggregates.loc[drivers_aggregates.index.isin(drivers)]
+    teams = team_aggregates(season)
+
+    # Driver offsets from their own team's average, which travel with the driver to the other cars
+    own_team = teams.loc[drivers_aggregates['TeamName'], FEATURES].to_numpy()
+    offsets = drivers_aggregates[FEATURES].to_numpy() - own_team
+
+    # (drivers x teams x FEATURES) by broadcasting, flattened to one row per pairing
+    features = teams[FEATURES].to_numpy()[np.newaxis, :, :] + offsets[:, np.newaxis, :]
+    features[:, :, FEATURES.index('Teammate_delta')] = drivers_aggregates['Teammate_delta'].to_numpy()[:, np.newaxis]
+    features = features.reshape(-1, len(FEATURES))
+
+    pairings = pd.DataFrame(features, columns=FEATURES, index=pd.MultiIndex.from_product(
+        [drivers_aggregates.index, teams.index], names=['Driver', 'Team']))
+    pairings[['Avg_Q', 'Avg_R']] = pairings[['Avg_Q', 'Avg_R']].clip(1, MAX_POSITION)
+    pairings[['Lap_stdev', 'DNFRate']] = pairings[['Lap_stdev', 'DNFRate']].clip(lower=0)
+    pairings['CurrentTeam'] = (drivers_aggregates['TeamName'].to_numpy()[:, np.newaxis] == teams.index.to_numpy()[np.newaxis, :]).ravel()
+    return pairings
+
+def predict_pairings(season:int, drivers:list = None, version:int = None) -> pd.DataFrame:
+    # Drivers x teams table of predicted synergies, on the 0-100 scale of the scores the model was trained on:
+    # the model learnt the scores of its artifact's weights, so those (not the session's) set the scale
+    artifact = load_model(version)
+    version = artifact['version']
+    weights = as_weights(artifact['weights'])
+    key = (version, season, tuple(sorted(drivers)) if drivers is not None else None)
+    with _lock:
+        if key in _pairings:
+            _pairings.move_to_end(key)
+            return _pairings[key]
+
+    pairings = pairing_features(season, drivers)
+    predictions = predict(pairings[FEATURES], version)
+
+    historic_scores = data_cleaning(pd.DataFrame(), weights)['SynergyScore']
+    low, high = historic_scores.min(), historic_scores.max()
+    normalised = (predictions - low) / (high - low) * 100 if high > low else np.zeros(len(predictions))
+    table = pd.Series(normalised, index=pairings.index).unstack('Team')
+
+    with _lock:
+        _pairings[key] = table
+        while len(_pairings) > MAX_CACHED_PAIRINGS:
+            _pairings.popitem(last=False)
+    return table
@@ -1,3 +1,6 @@
+import numpy as np
+import pandas as pd
+
 TEAM_COLORS = {
     'Mercedes': '#00D2BE',
     'Ferrari': '#DC0000',
@@ -27,4 +30,56 @@ QUALI_COLOR = '#1f77b4'
 RACE_COLOR = '#ff7f0e'
 DRIVER_SYNERGY_COLOR = '#1f77b4'
 AVG_SYNERGY_COLOR = '#2ca02c'
-BEST_SYNERGY_COLOR = '#d62728'
\ No newline at end of file
+BEST_SYNERGY_COLOR = '#d62728'
+
+# Line charts are downsampled to about one point per horizontal pixel of the chart before being sent to the browser
+DEFAULT_VIEWPORT_WIDTH = 1200   # px, a wide-layout Streamlit container
+POINTS_PER_PIXEL = 1
+
+def max_points(width:int = None) -> int:
+    return int((width or DEFAULT_VIEWPORT_WIDTH) * POINTS_PER_PIXEL)
+
+def figure_width(fig) -> int:
+    # Rendered width of a matplotlib figure in pixels
+    return int(fig.get_figwidth() * fig.dpi)
+
+def lttb_indices(x, y, threshold:int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: indices of the threshold points that best keep the line's shape.
+    # The first and last points are always kept, the rest are split into threshold - 2 buckets and each bucket
+    # keeps the point forming the largest triangle with the previous kept point and the next bucket's average
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    counts = np.diff(edges)
+    average_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    average_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+    # Third vertex of every bucket's triangles: the next bucket's average, the last point for the last bucket
+    next_x = np.append(average_x[1:], x[-1])
+    next_y = np.append(average_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket, (low, high) in enumerate(zip(edges[:-1], edges[1:])):
+        areas = np.abs((x[previous] - next_x[bucket]) * (y[low:high] - y[previous])
+                       - (x[previous] - x[low:high]) * (next_y[bucket] - y[previous]))
+        previous = low + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+def downsample(x, y, width:int = None) -> tuple:
+    # (x, y) reduced to what a chart of the given width can show
+    indices = lttb_indices(x, y, max_points(width))
+    return np.asarray(x)[indices], np.asarray(y)[indices]
+
+def downsample_frame(df:pd.DataFrame, x:str, y:str, group:str = None, width:int = None) -> pd.DataFrame:
+    # Same for a long frame plotted as one line per group (e.g. per driver); the frame is sorted by x
+    df = df.sort_values(x)
+    if group is None:
+        return df.iloc[lttb_indices(df[x], df[y], max_points(width))]
+    return pd.concat([lines.iloc[lttb_indices(lines[x], lines[y], max_points(width))]
+                      for _, lines in df.groupby(group, sort=False)])
@@ -0,0 +1,117 @@
+# Shared scheduler for fastf1 and OpenF1 fetches: a bounded thread pool plus a token bucket per upstream,
+# so fan-out across events and seasons runs in parallel without going over the upstream rate limits
+import os
+import time
+import asyncio
+import threading
+
+from contextlib import contextmanager
+from multiprocessing import Manager
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = int(os.environ.get('F1_MAX_WORKERS', 8))
+
+# Requests per second and burst size allowed for each upstream
+RATE_LIMITS = {
+    'fastf1': {'rate': 4.0, 'burst': 4},
+    'openf1': {'rate': 3.0, 'burst': 3}
+}
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_shared_buckets = {}    # upstream -> (state, lock) proxies shared by a process pool and its parent, see shared_rate_limits
+
+def _get_bucket(upstream:str) -> dict:
+    with _buckets_lock:
+        if upstream not in _buckets:
+            limits = RATE_LIMITS[upstream]
+            _buckets[upstream] = {
+                'rate': limits['rate'],
+                'burst': limits['burst'],
+                'tokens': float(limits['burst']),
+                'updated': time.monotonic(),
+                'lock': threading.Lock()
+            }
+        return _buckets[upstream]
+
+def set_rate_limit(upstream:str, rate:float, burst:int):
+    with _buckets_lock:
+        RATE_LIMITS[upstream] = {'rate': rate, 'burst': burst}
+        _buckets.pop(upstream, None)
+
+def _take_shared(upstream:str, tokens:int) -> float:
+    # Same as _take, on a bucket living in a manager process; wall clock time, as it is read by several processes
+    state, lock = _shared_buckets[upstream]
+    with lock:
+        now = time.time()
+        available = min(state['burst'], state['tokens'] + (now - state['updated']) * state['rate'])
+        state['updated'] = now
+        if available >= tokens:
+            state['tokens'] = available - tokens
+            return 0
+        state['tokens'] = available
+        return (tokens - available) / state['rate']
+
+def _take(upstream:str, tokens:int) -> float:
+    # Takes the tokens if the bucket has them and returns 0, otherwise returns how long to wait for them
+    if upstream in _shared_buckets:
+        return _take_shared(upstream, tokens)
+    bucket = _get_bucket(upstream)
+    with bucket['lock']:
+        now = time.monotonic()
+        bucket['tokens'] = min(bucket['burst'], bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+        bucket['updated'] = now
+        if bucket['tokens'] >= tokens:
+            bucket['tokens'] -= tokens
+            return 0
+        return (tokens - bucket['tokens']) / bucket['rate']
+
+def acquire(upstream:str, tokens:int = 1):
+    # Blocks until the upstream's bucket has enough tokens, refilling it at the configured rate
+    while (wait := _take(upstream, tokens)) > 0:
+        time.sleep(wait)
+
+async def acquire_async(upstream:str, tokens:int = 1):
+    # Same buckets as acquire(), so threaded and asyncio callers share one rate limit per upstream
+    while (wait := _take(upstream, tokens)) > 0:
+        await asyncio.sleep(wait)
+
+def run_parallel(func, items, upstream:str = None, max_workers:int = None) -> list:
+    # Calls func on every item and returns the results in the same order as the items.
+    # Items that fail are reported and give None, like the sequential loops this replaces.
+    items = list(items)
+    if not items:
+        return []
+
+    def task(item):
+        if upstream is not None:
+            acquire(upstream)
+        try:
+            return func(*item) if isinstance(item, tuple) else func(item)
+        except Exception as e:
+            print(f'Error processing {item}: {e}')
+            return None
+
+    workers = min(max_workers or MAX_WORKERS, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(task, items))
+
+def use_shared_buckets(shared:dict):
+    # ProcessPoolExecutor initializer: acquire() in the worker takes its tokens from the shared buckets
+    _shared_buckets.update(shared)
+
+@contextmanager
+def shared_rate_limits():
+    # One bucket per upstream shared by this process and the workers of a process pool (pass the yielded dict
+    # to use_shared_buckets as the pool's initializer), so N workers stay within the limit instead of N times it
+    with Manager() as manager:
+        shared = {}
+        for upstream, limits in RATE_LIMITS.items():
+            shared[upstream] = (manager.dict({'rate': limits['rate'], 'burst': limits['burst'],
+                                              'tokens': float(limits['burst']), 'updated': time.time()}), manager.Lock())
+        use_shared_buckets(shared)
+        try:
+            yield shared
+        finally:
+            for upstream in shared:
+                _shared_buckets.pop(upstream, None)